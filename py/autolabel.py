@@ -0,0 +1,191 @@
+import re
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+from autolabel_journal import atomic_write_text
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def list_images(folder):
+    """Klasördeki görselleri (alt klasörler dahil) dosya adındaki ilk sayıya göre sıralı listeler."""
+    files = [p for p in Path(folder).rglob("*") if p.suffix.lower() in IMAGE_EXTS]
+    return sorted(files, key=lambda x: int(re.search(r'\d+', x.stem).group()) if re.search(r'\d+', x.stem) else x.stem)
+
+
+def read_image(path):
+    """
+    Görseli BGR olarak bir kez çözer (ultralytics'in dosya yolundan okuduğu
+    biçimle aynı). np.fromfile + imdecode Windows'ta Türkçe karakterli
+    yollarda da çalışır. Okunamazsa None.
+    """
+    try:
+        data = np.fromfile(str(path), dtype=np.uint8)
+    except OSError:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+
+
+def iter_decoded(paths, threads=4, queue_size=32):
+    """
+    Görselleri arka planda bir iş parçacığı havuzunda çözer ve sırayı
+    koruyarak (path, görsel) çiftleri üretir. Sınırlı kuyruk (queue_size)
+    bellekte aynı anda tutulan çözülmüş görsel sayısını sınırlar.
+    """
+    pending = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def feed(pool):
+        for path in paths:
+            future = pool.submit(read_image, path)
+            while not stop.is_set():
+                try:
+                    pending.put((path, future), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+        pending.put(None)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        feeder = threading.Thread(target=feed, args=(pool,), daemon=True)
+        feeder.start()
+        try:
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                path, future = item
+                yield path, future.result()
+        finally:
+            stop.set()  # tüketici erken çıkarsa besleyici beklemede kalmasın
+            feeder.join()
+
+
+def _to_numpy(x):
+    # torch tensörü (ultralytics) ya da doğrudan numpy dizisi
+    return x.cpu().numpy() if hasattr(x, "cpu") else np.asarray(x)
+
+
+def yolo_label_lines(xyxy, cls, img_w, img_h):
+    """
+    Piksel xyxy kutularını YOLO satırlarına çevirir (class 4 satırları başa
+    alınır). İşlemler notebook'taki xyxy_to_yolo ile aynı sırada, float64
+    ile vektörel yapılır; çıktı birebir aynıdır.
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+    w = np.maximum(xyxy[:, 2] - xyxy[:, 0], 0.0)
+    h = np.maximum(xyxy[:, 3] - xyxy[:, 1], 0.0)
+    cx = xyxy[:, 0] + w / 2.0
+    cy = xyxy[:, 1] + h / 2.0
+    norm = np.stack([cx / img_w, cy / img_h, w / img_w, h / img_h], axis=1)
+
+    lines = []
+    for c, (x, y, bw, bh) in zip(np.asarray(cls).astype(int).tolist(), norm.tolist()):
+        line = f"{c} {x:.6f} {y:.6f} {bw:.6f} {bh:.6f}"
+        if c == 4:
+            lines.insert(0, line)
+        else:
+            lines.append(line)
+    return lines
+
+
+def write_label(label_path, lines):
+    atomic_write_text(label_path, "\n".join(lines))
+
+
+def autolabel_images(model, images, out_dir, conf=0.6, iou=0.2, device=None, batch_size=8,
+                     decode_threads=4, write_threads=2, queue_size=32, verbose=True, journal=None):
+    """
+    Görselleri toplu (batched) olarak etiketler ve YOLO txt'lerini out_dir'e yazar.
+
+    - Görseller arka planda decode_threads iş parçacığıyla çözülür ve sınırlı
+      bir kuyruktan batch_size'lık gruplar halinde tek model.predict çağrısına
+      verilir. Her dosya yalnızca bir kez okunur; boyut çözülmüş diziden alınır.
+    - Label dosyaları write_threads iş parçacığıyla arka planda, atomik
+      (geçici dosya + os.replace) olarak yazılır.
+    - journal (AutolabelJournal) verilirse aynı model ve ayarlarla zaten
+      etiketlenmiş görseller atlanır; her label yazıldıktan sonra günlüğe işlenir.
+
+    model, ultralytics YOLO gibi predict(source=[BGR dizi, ...], conf, iou,
+    device, verbose) çağrısına her görsel için .boxes (xyxy, cls) taşıyan bir
+    sonuç listesi döndüren herhangi bir nesne olabilir.
+
+    Returns:
+        {"images", "labelled", "empty", "failed", "skipped", "seconds"}
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    images = list(images)
+    stats = {"images": 0, "labelled": 0, "empty": 0, "failed": 0, "skipped": 0}
+    if journal is not None:
+        todo = journal.pending([(p, out_dir / (p.stem + ".txt")) for p in images], threads=decode_threads)
+        stats["skipped"] = len(images) - len(todo)
+        images = [p for p, _ in todo]
+    start = time.perf_counter()
+    writes = deque()
+
+    def finish_write():
+        future, img_path, label_path, n_boxes = writes.popleft()
+        future.result()
+        if journal is not None:
+            journal.mark_done(img_path, label_path, n_boxes)
+
+    def submit_write(writer, img_path, label_path, lines):
+        writes.append((writer.submit(write_label, label_path, lines), img_path, label_path, len(lines)))
+        while len(writes) > queue_size:  # yazma kuyruğu da sınırlı
+            finish_write()
+
+    def run_batch(writer, batch):
+        results = model.predict(source=[img for _, img in batch], conf=conf, iou=iou,
+                                device=device, verbose=False)
+        for (img_path, img), res in zip(batch, results):
+            stats["images"] += 1
+            label_path = out_dir / (img_path.stem + ".txt")
+            boxes = res.boxes if res is not None else None
+            if boxes is None or len(boxes) == 0:
+                submit_write(writer, img_path, label_path, [])
+                stats["empty"] += 1
+                if verbose:
+                    print(f"Etiket yok (boş txt yazıldı): {img_path.name}")
+                continue
+            img_h, img_w = img.shape[:2]
+            lines = yolo_label_lines(_to_numpy(boxes.xyxy), _to_numpy(boxes.cls), img_w, img_h)
+            submit_write(writer, img_path, label_path, lines)
+            stats["labelled"] += 1
+            if verbose:
+                print(f"Yazıldı: {label_path.name}  (n={len(lines)})")
+        if len(results) < len(batch):
+            for img_path, _ in batch[len(results):]:
+                print(f"Uyarı: Sonuç yok -> {img_path.name}")
+
+    with ThreadPoolExecutor(max_workers=write_threads) as writer:
+        try:
+            batch = []
+            for img_path, img in iter_decoded(images, threads=decode_threads, queue_size=queue_size):
+                if img is None:
+                    stats["failed"] += 1
+                    print(f"Uyarı: Görsel okunamadı -> {img_path.name}")
+                    continue
+                batch.append((img_path, img))
+                if len(batch) >= batch_size:
+                    run_batch(writer, batch)
+                    batch = []
+            if batch:
+                run_batch(writer, batch)
+        finally:
+            # Model hata verse de o ana kadar yazılan label'lar günlüğe işlensin
+            while writes:
+                finish_write()
+
+    stats["seconds"] = time.perf_counter() - start
+    print(f"🏁 {stats['images']} görsel etiketlendi ({stats['empty']} boş, {stats['failed']} okunamadı, "
+          f"{stats['skipped']} atlandı), "
+          f"{stats['images'] / max(stats['seconds'], 1e-9):.1f} görsel/sn")
+    return stats
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOURNAL_NAME = ".autolabel_journal.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,   -- görselin mutlak yolu
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    hash      TEXT NOT NULL       -- içerik hash'i (boyut/mtime değişmedikçe yeniden hesaplanmaz)
+);
+CREATE TABLE IF NOT EXISTS done (
+    image_hash  TEXT NOT NULL,
+    model_hash  TEXT NOT NULL,
+    settings    TEXT NOT NULL,    -- eşikler vb. (sıralı anahtarlı JSON)
+    label       TEXT NOT NULL,    -- yazılan label dosyasının mutlak yolu
+    boxes       INTEGER NOT NULL,
+    finished    REAL NOT NULL,
+    PRIMARY KEY (image_hash, model_hash, settings, label)
+);
+"""
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    """
+    Önce aynı klasördeki geçici dosyaya yazar, sonra os.replace ile yerine
+    koyar: yarıda kalan bir çalıştırma asla kesik .txt bırakmaz.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding=encoding) as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class AutolabelJournal:
+    """
+    Autolabel çalıştırmaları için SQLite tamamlanma günlüğü.
+
+    Her etiketlenen görsel için (içerik hash'i, model hash'i, ayarlar, label
+    yolu) kaydedilir. Yeniden çalıştırmada pending() aynı model ve ayarlarla
+    zaten etiketlenmiş (ve label dosyası hâlâ duran) görselleri eler; çökme
+    veya kernel yeniden başlatması sonrası yalnızca kalan görseller işlenir.
+    Model dosyası ya da eşikler değişirse her şey yeniden etiketlenir.
+
+    Kayıtlar commit_every işaretlemede bir diske yazılır; çökmede en fazla
+    son commit'ten sonraki görseller yeniden işlenir (label'lar atomik
+    yazıldığı için bu güvenlidir).
+    """
+
+    def __init__(self, journal_path, model_path, settings, commit_every=64):
+        self.journal_path = journal_path
+        self.model_hash = file_digest(model_path) if os.path.isfile(model_path) else str(model_path)
+        self.settings = json.dumps(settings, sort_keys=True, default=str)
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        self._hashes = {}
+        self.conn = sqlite3.connect(journal_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _image_hashes(self, paths, threads):
+        """{mutlak yol: içerik hash'i}; boyut/mtime'ı kayıtlı olanlar yeniden okunmaz."""
+        stored = {path: (size, mtime, digest)
+                  for path, size, mtime, digest in self.conn.execute("SELECT path, size, mtime_ns, hash FROM files")}
+        hashes, stale = {}, []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            cached = stored.get(path)
+            if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+                hashes[path] = cached[2]
+            else:
+                stale.append((path, st.st_size, st.st_mtime_ns))
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                digests = list(executor.map(file_digest, [p for p, _, _ in stale]))
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                      [(p, size, mtime, d) for (p, size, mtime), d in zip(stale, digests)])
+            hashes.update((p, d) for (p, _, _), d in zip(stale, digests))
+        return hashes
+
+    def pending(self, items, threads=4):
+        """
+        items: [(görsel yolu, label yolu), ...]. Henüz bu model ve ayarlarla
+        etiketlenmemiş olanları aynı sırayla döndürür.
+        """
+        items = list(items)
+        keys = [(os.path.abspath(img), os.path.abspath(lbl)) for img, lbl in items]
+        hashes = self._image_hashes([img for img, _ in keys], threads)
+        done = set(self.conn.execute("SELECT image_hash, label FROM done WHERE model_hash = ? AND settings = ?",
+                                     (self.model_hash, self.settings)))
+        result = []
+        for item, (img, lbl) in zip(items, keys):
+            digest = hashes.get(img)
+            if digest is not None:
+                self._hashes[img] = digest
+                if (digest, lbl) in done and os.path.exists(lbl):
+                    continue
+            result.append(item)
+        skipped = len(items) - len(result)
+        if skipped:
+            print(f"⏭️  {skipped} görsel aynı model ve ayarlarla zaten etiketlenmiş, atlandı "
+                  f"({len(result)} görsel kaldı).")
+        return result
+
+    def mark_done(self, image_path, label_path, n_boxes):
+        """Label dosyası diske yazıldıktan sonra çağrılır."""
+        img = os.path.abspath(image_path)
+        digest = self._hashes.get(img) or file_digest(img)
+        self.conn.execute("INSERT OR REPLACE INTO done VALUES (?, ?, ?, ?, ?, ?)",
+                          (digest, self.model_hash, self.settings, os.path.abspath(label_path), n_boxes, time.time()))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.conn.commit()
+            self._uncommitted = 0
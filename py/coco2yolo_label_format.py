@@ -1,5 +1,12 @@
 import json
 import os
+import codecs
+import io
+import time
+import contextlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 from tqdm import tqdm # İlerleme çubuğu için (isteğe bağlı, pip install tqdm)
 import argparse
 
@@ -46,13 +53,106 @@ def convert_coco_bbox_to_yolo(coco_bbox, img_width, img_height):
 
   return [x_center_norm, y_center_norm, width_norm, height_norm]
 
-def coco_to_yolo(coco_json_path, output_dir):
+# Uzunluğu 4 olmayan / boş bbox'lar toplu dönüşümde bu satırla temsil edilir (atlanır)
+_INVALID_BBOX = (float("nan"),) * 4
+
+def convert_coco_bboxes_to_yolo_batch(bboxes, img_widths, img_heights):
+  """
+  convert_coco_bbox_to_yolo'nun NumPy ile toplu (vektörel) sürümü.
+
+  Bir görüntünün ya da tüm veri setinin bbox'larını tek seferde kırpar,
+  normalize eder ve geçersizleri eler. Her kutu için uyarı yazdırmak yerine
+  kırpılan/atlanan kutu sayılarını döndürür. Sonuçlar skaler fonksiyonla
+  birebir aynıdır (aynı float64 işlemleri, aynı sırayla).
+
+  Args:
+      bboxes: (N, 4) [x_min, y_min, width, height] dizisi.
+      img_widths: (N,) görüntü genişlikleri (veya tek bir sayı).
+      img_heights: (N,) görüntü yükseklikleri (veya tek bir sayı).
+
+  Returns:
+      (yolo, keep, stats):
+        yolo: (N, 4) [x_center_norm, y_center_norm, width_norm, height_norm]
+        keep: (N,) bool, yazılacak kutular
+        stats: {'clipped': kırpılıp tutulan, 'dropped': atlanan} kutu sayıları
+  """
+  b = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+  n = len(b)
+  img_w = np.broadcast_to(np.asarray(img_widths, dtype=np.float64), (n,))
+  img_h = np.broadcast_to(np.asarray(img_heights, dtype=np.float64), (n,))
+  x_min, y_min, w, h = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+
+  invalid = ~np.isfinite(b).all(axis=1) | (img_w <= 0) | (img_h <= 0)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    out_of_bounds = ((x_min < 0) | (y_min < 0) | (w <= 0) | (h <= 0)
+                     | (x_min + w > img_w) | (y_min + h > img_h)) & ~invalid
+
+    # Kırpma yalnızca sınır dışı kutulara uygulanır (skaler yolla aynı sonuç için)
+    x_c = np.maximum(0, x_min)
+    y_c = np.maximum(0, y_min)
+    x_min = np.where(out_of_bounds, x_c, x_min)
+    y_min = np.where(out_of_bounds, y_c, y_min)
+    w = np.where(out_of_bounds, np.minimum(w, img_w - x_c), w)
+    h = np.where(out_of_bounds, np.minimum(h, img_h - y_c), h)
+    keep = ~invalid & (w > 0) & (h > 0)
+
+    yolo = np.empty((n, 4), dtype=np.float64)
+    yolo[:, 0] = (x_min + w / 2) / img_w
+    yolo[:, 1] = (y_min + h / 2) / img_h
+    yolo[:, 2] = w / img_w
+    yolo[:, 3] = h / img_h
+
+  stats = {
+      'clipped': int(np.count_nonzero(out_of_bounds & keep)),
+      'dropped': int(n - np.count_nonzero(keep)),
+  }
+  return yolo, keep, stats
+
+def format_yolo_lines(class_indices, yolo_bboxes):
+  """YOLO satırlarını '%d %.6f %.6f %.6f %.6f\\n' formatında toplu üretir."""
+  rows = zip(np.asarray(class_indices).tolist(), *np.asarray(yolo_bboxes).T.tolist())
+  return ["%d %.6f %.6f %.6f %.6f\n" % row for row in rows]
+
+def _write_label_shard(shard):
+  for path, mode, lines in shard:
+    with open(path, mode) as yolo_f:
+      yolo_f.writelines(lines)
+  return len(shard)
+
+def write_label_files(items, executor=None, pbar=None, shard_size=256):
+  """
+  (yol, mod, satırlar) üçlülerini diske yazar.
+
+  executor verilirse dosyalar parçalara (shard) bölünüp paralel yazılır ve
+  ilerleme tek tqdm çubuğunda birleştirilir. Aynı yola giden kayıtlar daima
+  aynı parçaya, sıraları korunarak düşer; böylece sonuç seri yazımla birebir aynıdır.
+  """
+  if executor is None:
+    for item in items:
+      _write_label_shard([item])
+      if pbar is not None:
+        pbar.update(1)
+    return
+
+  items = list(items)
+  n_shards = max(1, (len(items) + shard_size - 1) // shard_size)
+  shards = [[] for _ in range(n_shards)]
+  for item in items:
+    shards[hash(item[0]) % n_shards].append(item)
+  futures = [executor.submit(_write_label_shard, shard) for shard in shards if shard]
+  for future in as_completed(futures):
+    written = future.result()
+    if pbar is not None:
+      pbar.update(written)
+
+def coco_to_yolo(coco_json_path, output_dir, workers=1):
   """
   COCO JSON formatındaki veri setini YOLO formatına dönüştürür.
 
   Args:
       coco_json_path: COCO formatındaki JSON dosyasının yolu.
       output_dir: Oluşturulacak YOLO .txt etiket dosyalarının kaydedileceği dizin.
+      workers: Etiket dosyalarını paralel yazacak iş parçacığı sayısı (1 = seri).
   """
   try:
     with open(coco_json_path, 'r') as f:
@@ -102,62 +202,403 @@ def coco_to_yolo(coco_json_path, output_dir):
   else:
       annotations = coco_data['annotations']
 
-  image_id_to_annotations = {}
+  # ----- Tüm bbox'ları tek bir dizide topla (görüntü sırası korunur) -----
+  image_ids = list(image_id_to_info)
+  image_id_to_row = {image_id: row for row, image_id in enumerate(image_ids)}
+  ann_rows, ann_classes, ann_bboxes = [], [], []
   for ann in annotations:
-    image_id = ann['image_id']
-    if image_id not in image_id_to_annotations:
-      image_id_to_annotations[image_id] = []
-    image_id_to_annotations[image_id].append(ann)
+    row = image_id_to_row.get(ann['image_id'])
+    if row is None:
+      continue
+    coco_cat_id = ann['category_id']
+    if coco_cat_id not in coco_cat_id_to_yolo_idx:
+      print(f"Uyarı: Bilinmeyen kategori ID'si {coco_cat_id} bulundu, atlanıyor. Görüntü: {image_id_to_info[ann['image_id']]['file_name']}")
+      continue
+    coco_bbox = ann['bbox']
+    ann_rows.append(row)
+    ann_classes.append(coco_cat_id_to_yolo_idx[coco_cat_id])
+    ann_bboxes.append(coco_bbox if coco_bbox and len(coco_bbox) == 4 else _INVALID_BBOX)
+
+  # ----- Vektörel dönüşüm -----
+  img_widths = np.array([info['width'] for info in image_id_to_info.values()], dtype=np.float64)
+  img_heights = np.array([info['height'] for info in image_id_to_info.values()], dtype=np.float64)
+  ann_rows = np.asarray(ann_rows, dtype=np.int64)
+  yolo_bboxes, keep, stats = convert_coco_bboxes_to_yolo_batch(
+      np.asarray(ann_bboxes, dtype=np.float64).reshape(-1, 4), img_widths[ann_rows], img_heights[ann_rows])
+  lines = format_yolo_lines(np.asarray(ann_classes, dtype=np.int64)[keep], yolo_bboxes[keep])
+  kept_rows = ann_rows[keep]
+
+  # Satırları görüntülere göre grupla (stable sıralama dosya içi sırayı korur)
+  order = np.argsort(kept_rows, kind='stable')
+  sorted_rows = kept_rows[order]
+  bounds = np.searchsorted(sorted_rows, np.arange(len(image_ids) + 1))
+  order = order.tolist()
 
   # ----- YOLO formatında etiket dosyalarını oluştur -----
   missing_images_count = 0
-  processed_images_count = 0
   print(f"Toplam {len(image_id_to_info)} görüntü işleniyor...")
 
-  for image_id, img_info in tqdm(image_id_to_info.items(), desc="Dönüştürülüyor"):
-    img_filename_base = os.path.splitext(img_info['file_name'])[0]
-    yolo_txt_filename = f"{img_filename_base}.txt"
-    yolo_txt_path = os.path.join(output_dir, yolo_txt_filename)
+  def label_items():
+    for row, image_id in enumerate(image_ids):
+      img_filename_base = os.path.splitext(image_id_to_info[image_id]['file_name'])[0]
+      yolo_txt_path = os.path.join(output_dir, f"{img_filename_base}.txt")
+      # Anotasyonu olmayan görüntüler için boş dosya oluşturulur (YOLO bunu bekler)
+      yield yolo_txt_path, 'w', [lines[i] for i in order[bounds[row]:bounds[row + 1]]]
 
-    img_width = img_info['width']
-    img_height = img_info['height']
+  with tqdm(total=len(image_ids), desc="Dönüştürülüyor") as pbar:
+    if workers > 1:
+      with ThreadPoolExecutor(max_workers=workers) as executor:
+        write_label_files(label_items(), executor=executor, pbar=pbar)
+    else:
+      write_label_files(label_items(), pbar=pbar)
+  processed_images_count = len(image_ids)
 
-    with open(yolo_txt_path, 'w') as yolo_f:
-      if image_id in image_id_to_annotations:
-        for ann in image_id_to_annotations[image_id]:
-          coco_cat_id = ann['category_id']
-          coco_bbox = ann['bbox']
+  print("\nDönüştürme tamamlandı.")
+  print(f"Toplam {processed_images_count} etiket dosyası oluşturuldu: {output_dir}")
+  if stats['clipped'] or stats['dropped']:
+      print(f"Uyarı: {stats['clipped']} bbox görüntü sınırlarına kırpıldı, {stats['dropped']} geçersiz bbox atlandı.")
+  if missing_images_count > 0:
+      print(f"Uyarı: {missing_images_count} görüntü için JSON içinde bilgi bulunamadı.")
+
+
+class CocoStreamReader:
+  """
+  Büyük COCO JSON dosyalarını tamamını belleğe almadan okur.
+
+  Dosya parça parça (chunk_size bayt) çözülür; üst seviyedeki dizilerin
+  ('images', 'annotations', 'categories' ...) elemanları tek tek
+  json.JSONDecoder.raw_decode ile ayrıştırılıp döndürülür ve hemen bırakılır.
+  Böylece bellekte aynı anda yalnızca bir eleman ve bir okuma tamponu bulunur.
+  """
 
-          if coco_cat_id not in coco_cat_id_to_yolo_idx:
-              print(f"Uyarı: Bilinmeyen kategori ID'si {coco_cat_id} bulundu, atlanıyor. Görüntü: {img_info['file_name']}")
-              continue
+  def __init__(self, path, chunk_size=1 << 20):
+    self.path = path
+    self.chunk_size = chunk_size
+    self.sections_done = set()  # Tamamen okunmuş üst seviye anahtarlar
+    self._decoder = json.JSONDecoder()
+
+  def _fill(self):
+    chunk = self._file.read(self.chunk_size)
+    if not chunk:
+      self._buf += self._text_decoder.decode(b"", final=True)
+      self._eof = True
+      return False
+    self._buf += self._text_decoder.decode(chunk)
+    return True
+
+  def _compact(self):
+    # Okunmuş kısmı at ki tampon büyümesin
+    if self._pos > self.chunk_size:
+      self._buf = self._buf[self._pos:]
+      self._pos = 0
+
+  def _peek(self):
+    """Boşlukları atlar ve sıradaki karakteri döndürür (dosya sonunda '')."""
+    while True:
+      buf, pos = self._buf, self._pos
+      while pos < len(buf) and buf[pos] in " \t\r\n":
+        pos += 1
+      self._pos = pos
+      if pos < len(buf):
+        return buf[pos]
+      if self._eof or not self._fill():
+        return ""
+
+  def _expect(self, char):
+    if self._peek() != char:
+      raise json.JSONDecodeError(f"'{char}' bekleniyordu", self._buf, self._pos)
+    self._pos += 1
+
+  def _decode_value(self):
+    self._peek()
+    while True:
+      try:
+        value, end = self._decoder.raw_decode(self._buf, self._pos)
+        # Tamponun sonuna dayanan değer (ör. bölünmüş bir sayı) eksik olabilir
+        if end < len(self._buf) or self._eof:
+          self._pos = end
+          return value
+      except json.JSONDecodeError:
+        if self._eof:
+          raise
+      self._fill()
+
+  def iter_items(self, sections):
+    """
+    'sections' içindeki üst seviye dizilerin elemanlarını (anahtar, eleman)
+    olarak sırayla döndürür. Diğer anahtarlar okunup atlanır.
+    """
+    self.sections_done = set()
+    with open(self.path, "rb") as self._file:
+      self._text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+      self._buf, self._pos, self._eof = "", 0, False
+
+      self._expect("{")
+      if self._peek() == "}":
+        return
+      while True:
+        key = self._decode_value()
+        self._expect(":")
+        if self._peek() == "[":
+          self._pos += 1
+          if self._peek() == "]":
+            self._pos += 1
+          else:
+            while True:
+              item = self._decode_value()
+              if key in sections:
+                yield key, item
+              del item
+              self._compact()
+              sep = self._peek()
+              self._pos += 1
+              if sep == "]":
+                break
+              if sep != ",":
+                raise json.JSONDecodeError("',' veya ']' bekleniyordu", self._buf, self._pos - 1)
+        else:
+          self._decode_value()  # Dizi olmayan değerler (info, licenses ...) atlanır
+        self.sections_done.add(key)
+        self._compact()
+        sep = self._peek()
+        self._pos += 1
+        if sep == "}":
+          break
+        if sep != ",":
+          raise json.JSONDecodeError("',' veya '}' bekleniyordu", self._buf, self._pos - 1)
+
+
+def coco_to_yolo_streaming(coco_json_path, output_dir, max_pending_lines=200000, workers=1):
+  """
+  coco_to_yolo'nun çok büyük (GB'larca) JSON dosyaları için akış (streaming) sürümü.
 
-          yolo_class_index = coco_cat_id_to_yolo_idx[coco_cat_id]
-          yolo_bbox = convert_coco_bbox_to_yolo(coco_bbox, img_width, img_height)
+  'images' ve 'categories' akış halinde okunur; görüntü başına yalnızca
+  kompakt diziler (genişlik, yükseklik, dosya kökü) tutulur. Annotasyonlar
+  görüntü bazında tamponlanır ve toplu (vektörel) olarak dönüştürülür;
+  annotasyonlar image_id'ye göre sıralıysa tamamlanan görüntülerin etiketleri
+  küçük gruplar halinde hemen yazılır. Sırasız dosyalarda tampon max_pending_lines satırı
+  aşınca tüm bekleyen satırlar ilgili dosyalara eklenir (append), bu nedenle
+  tepe bellek kullanımı JSON boyutundan bağımsızdır.
 
-          if yolo_bbox: # Dönüşüm başarılıysa yaz
-              x_center, y_center, w_norm, h_norm = yolo_bbox
-              yolo_f.write(f"{yolo_class_index} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n")
+  Args:
+      coco_json_path: COCO formatındaki JSON dosyasının yolu.
+      output_dir: YOLO .txt etiket dosyalarının kaydedileceği dizin.
+      max_pending_lines: Diske yazılmadan bellekte tutulacak en fazla satır sayısı.
+      workers: Etiket dosyalarını paralel yazacak iş parçacığı sayısı (1 = seri).
+  """
+  if not os.path.isfile(coco_json_path):
+    print(f"Hata: COCO JSON dosyası bulunamadı: {coco_json_path}")
+    return
+
+  os.makedirs(output_dir, exist_ok=True)
+  reader = CocoStreamReader(coco_json_path)
+  # Tamamlanan görüntüler bu kadar satır birikince toplu dönüştürülüp yazılır
+  write_batch_lines = min(4096, max_pending_lines)
+
+  coco_cat_ids = set()
+  image_id_to_row = {}
+  widths, heights = array("d"), array("d")
+  stems = []
+
+  pending = {}          # row -> [(yolo sınıf indexi, coco bbox), ...]
+  pending_count = 0
+  started = bytearray() # row için dosya bu çalıştırmada oluşturuldu mu?
+  state = {"last_row": None, "missing": 0, "clipped": 0, "dropped": 0}
+
+  def flush(rows):
+    """Bekleyen annotasyonları tek bir vektörel çağrıyla dönüştürüp dosyalara yazar."""
+    nonlocal pending_count
+    rows = [row for row in rows if row in pending]
+    if not rows:
+      return
+    counts = [len(pending[row]) for row in rows]
+    items = [item for row in rows for item in pending.pop(row)]
+    pending_count -= len(items)
+
+    row_arr = np.repeat(np.asarray(rows, dtype=np.int64), counts)
+    yolo_bboxes, keep, stats = convert_coco_bboxes_to_yolo_batch(
+        [bbox for _, bbox in items],
+        np.frombuffer(widths, dtype=np.float64)[row_arr],
+        np.frombuffer(heights, dtype=np.float64)[row_arr])
+    state["clipped"] += stats['clipped']
+    state["dropped"] += stats['dropped']
+    lines = format_yolo_lines(np.fromiter((cls for cls, _ in items), dtype=np.int64, count=len(items))[keep],
+                              yolo_bboxes[keep])
+
+    keep = keep.tolist()
+    items = []
+    start = line_start = 0
+    for row, count in zip(rows, counts):
+      n_kept = sum(keep[start:start + count])
+      start += count
+      mode = "a" if started[row] else "w"
+      items.append((os.path.join(output_dir, f"{stems[row]}.txt"), mode, lines[line_start:line_start + n_kept]))
+      line_start += n_kept
+      started[row] = 1
+    write_label_files(items, executor=executor)
+
+  def handle_annotation(ann, cat_map):
+    nonlocal pending_count
+    row = image_id_to_row.get(ann['image_id'])
+    if row is None:
+      state["missing"] += 1
+      return
+    # Sıralı akışta önceki görüntüler tamamlandı; yeterince birikmişse hemen yaz
+    last_row = state["last_row"]
+    if last_row != row and pending_count >= write_batch_lines:
+      flush([r for r in pending if r != row])
+    state["last_row"] = row
+
+    coco_cat_id = ann['category_id']
+    if coco_cat_id not in cat_map:
+      print(f"Uyarı: Bilinmeyen kategori ID'si {coco_cat_id} bulundu, atlanıyor. Görüntü: {stems[row]}")
+      return
+    coco_bbox = ann['bbox']
+    pending.setdefault(row, []).append(
+        (cat_map[coco_cat_id], coco_bbox if coco_bbox and len(coco_bbox) == 4 else _INVALID_BBOX))
+    pending_count += 1
+    if pending_count >= max_pending_lines:
+      flush(list(pending))
+
+  def build_cat_map():
+    return {cat_id: idx for idx, cat_id in enumerate(sorted(coco_cat_ids))}
+
+  # ----- 1. geçiş: images + categories (annotasyonlar bunlardan sonra geliyorsa aynı geçişte işlenir) -----
+  cat_map = None
+  needs_second_pass = False
+  annotations_seen = False
+  pbar = tqdm(desc="Dönüştürülüyor (stream)", unit=" ann")
+  executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+  try:
+    for section, item in reader.iter_items({"images", "categories", "annotations"}):
+      if section == "images":
+        row = image_id_to_row.get(item['id'])
+        if row is not None:
+          # Tekrarlanan id: bellek içi yoldaki gibi son kayıt geçerli, aynı satır kullanılır
+          stems[row] = os.path.splitext(item['file_name'])[0]
+          widths[row] = item['width']
+          heights[row] = item['height']
+          continue
+        image_id_to_row[item['id']] = len(stems)
+        stems.append(os.path.splitext(item['file_name'])[0])
+        widths.append(item['width'])
+        heights.append(item['height'])
+        started.append(0)
+      elif section == "categories":
+        coco_cat_ids.add(item['id'])
       else:
-        # Eğer bir görüntü için hiç anotasyon yoksa boş dosya oluşturulur (YOLO bunu bekler)
-        pass # Dosya zaten 'w' modunda açıldığı için boş kalacak
+        annotations_seen = True
+        if cat_map is None:
+          if {"images", "categories"} <= reader.sections_done:
+            cat_map = build_cat_map()
+          else:
+            needs_second_pass = True
+        if needs_second_pass:
+          continue
+        handle_annotation(item, cat_map)
+        pbar.update(1)
 
-    processed_images_count += 1
+    if "images" not in reader.sections_done:
+      print("Hata: JSON dosyasında 'images' anahtarı bulunamadı.")
+      return
+    if "categories" not in reader.sections_done:
+      print("Hata: JSON dosyasında 'categories' anahtarı bulunamadı.")
+      return
+    if not annotations_seen and "annotations" not in reader.sections_done:
+      print("Uyarı: JSON dosyasında 'annotations' anahtarı bulunamadı. Etiket dosyaları boş olabilir.")
+
+    # ----- 2. geçiş: annotasyonlar images/categories'ten önce geldiyse -----
+    if needs_second_pass:
+      cat_map = build_cat_map()
+      for _, item in reader.iter_items({"annotations"}):
+        handle_annotation(item, cat_map)
+        pbar.update(1)
+
+    flush(list(pending))
+
+    # Hiç annotasyonu olmayan görüntüler için boş dosya (YOLO bunu bekler)
+    write_label_files(((os.path.join(output_dir, f"{stems[row]}.txt"), "w", [])
+                       for row, done in enumerate(started) if not done), executor=executor)
+  except json.JSONDecodeError:
+    print(f"Hata: COCO JSON dosyası okunamadı veya bozuk: {coco_json_path}")
+    return
+  finally:
+    pbar.close()
+    if executor is not None:
+      executor.shutdown()
 
   print("\nDönüştürme tamamlandı.")
-  print(f"Toplam {processed_images_count} etiket dosyası oluşturuldu: {output_dir}")
-  if missing_images_count > 0:
-      print(f"Uyarı: {missing_images_count} görüntü için JSON içinde bilgi bulunamadı.")
+  print(f"Toplam {len(stems)} etiket dosyası oluşturuldu: {output_dir}")
+  if state["clipped"] or state["dropped"]:
+      print(f"Uyarı: {state['clipped']} bbox görüntü sınırlarına kırpıldı, {state['dropped']} geçersiz bbox atlandı.")
+  if state["missing"] > 0:
+      print(f"Uyarı: {state['missing']} annotasyonun görüntüsü JSON içinde bulunamadı.")
+
+def benchmark_bbox_conversion(n_boxes=200000, seed=0):
+  """
+  Skaler (convert_coco_bbox_to_yolo + f-string) ve vektörel yolu rastgele
+  bbox'larla karşılaştırır; çıktıların birebir aynı olduğunu doğrular.
+  """
+  rng = np.random.default_rng(seed)
+  img_w = rng.choice([640, 1280, 1920], size=n_boxes)
+  img_h = rng.choice([480, 720, 1080], size=n_boxes)
+  # ~%10 kutu sınır dışına taşsın / geçersiz olsun
+  bboxes = np.stack([
+      rng.uniform(-0.05, 1.0, n_boxes) * img_w,
+      rng.uniform(-0.05, 1.0, n_boxes) * img_h,
+      rng.uniform(-0.01, 0.3, n_boxes) * img_w,
+      rng.uniform(-0.01, 0.3, n_boxes) * img_h,
+  ], axis=1)
+  classes = rng.integers(0, 80, n_boxes)
+  bbox_list, w_list, h_list, cls_list = bboxes.tolist(), img_w.tolist(), img_h.tolist(), classes.tolist()
+
+  start = time.perf_counter()
+  scalar_lines = []
+  with contextlib.redirect_stdout(io.StringIO()):  # Uyarı çıktısını ölçüme katma
+    for cls, bbox, w, h in zip(cls_list, bbox_list, w_list, h_list):
+      yolo_bbox = convert_coco_bbox_to_yolo(bbox, w, h)
+      if yolo_bbox:
+        x_center, y_center, w_norm, h_norm = yolo_bbox
+        scalar_lines.append(f"{cls} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n")
+  scalar_time = time.perf_counter() - start
+
+  start = time.perf_counter()
+  yolo_bboxes, keep, stats = convert_coco_bboxes_to_yolo_batch(bboxes, img_w, img_h)
+  batch_lines = format_yolo_lines(classes[keep], yolo_bboxes[keep])
+  batch_time = time.perf_counter() - start
+
+  print(f"Kutu sayısı      : {n_boxes} (kırpılan: {stats['clipped']}, atlanan: {stats['dropped']})")
+  print(f"Skaler yol       : {scalar_time:.3f} sn")
+  print(f"Vektörel yol     : {batch_time:.3f} sn  (x{scalar_time / max(batch_time, 1e-9):.1f})")
+  print(f"Çıktılar aynı mı : {'Evet' if scalar_lines == batch_lines else 'HAYIR'}")
+  return scalar_lines == batch_lines
 
 # Komut satırı argümanlarını işlemek için (isteğe bağlı)
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Convert COCO JSON annotations to YOLO format.')
-    parser.add_argument('json_file', type=str, help='Path to the COCO JSON annotation file.')
-    parser.add_argument('output_dir', type=str, help='Directory to save the output YOLO .txt files.')
+    parser.add_argument('json_file', type=str, nargs='?', help='Path to the COCO JSON annotation file.')
+    parser.add_argument('output_dir', type=str, nargs='?', help='Directory to save the output YOLO .txt files.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse the JSON incrementally with bounded memory (for multi-GB files).')
+    parser.add_argument('--max-pending-lines', type=int, default=200000,
+                        help='Stream mode: max label lines buffered in memory before flushing to disk.')
+
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of threads writing label files in parallel (sharded writer).')
+    parser.add_argument('--benchmark', type=int, metavar='N', default=0,
+                        help='Benchmark scalar vs vectorized bbox conversion on N random boxes and exit.')
 
     args = parser.parse_args()
 
-    coco_to_yolo(args.json_file, args.output_dir)
+    if args.benchmark:
+        benchmark_bbox_conversion(args.benchmark)
+    elif not args.json_file or not args.output_dir:
+        parser.error('json_file and output_dir are required')
+    elif args.stream:
+        coco_to_yolo_streaming(args.json_file, args.output_dir,
+                               max_pending_lines=args.max_pending_lines, workers=args.workers)
+    else:
+        coco_to_yolo(args.json_file, args.output_dir, workers=args.workers)
 
     # Örnek kullanım (komut satırı yerine doğrudan çalıştırmak isterseniz):
     # coco_json_input_path = 'val.json' # COCO JSON dosyanızın yolu
@@ -0,0 +1,200 @@
+import os
+import json
+import sqlite3
+import time
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+LABEL_EXT = ".txt"
+DEFAULT_INDEX_NAME = ".dataset_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path      TEXT PRIMARY KEY,   -- köke göre göreli klasör yolu ('' = kök)
+    mtime_ns  INTEGER NOT NULL,
+    subdirs   TEXT NOT NULL       -- alt klasör isimleri (JSON liste)
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir           TEXT NOT NULL,  -- dosyanın bulunduğu images/ veya labels/ klasörü
+    name          TEXT NOT NULL,
+    class_folder  TEXT NOT NULL,  -- images/labels klasörünün üst klasörü
+    kind          TEXT NOT NULL,  -- 'image' | 'label'
+    stem          TEXT NOT NULL,  -- eşleştirme anahtarı (uzantısız, normcase)
+    ext           TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    PRIMARY KEY (dir, name)
+);
+CREATE INDEX IF NOT EXISTS files_pair ON files (class_folder, kind, stem);
+"""
+
+
+class DatasetIndex:
+    """
+    YOLO veri seti için diskte kalıcı (SQLite) dosya indeksi.
+
+    Her images/ ve labels/ klasöründeki dosyalar (sınıf klasörü, kök isim,
+    uzantı, boyut, mtime) olarak saklanır. refresh() klasörlerin mtime
+    değerlerini karşılaştırır: mtime'ı değişmeyen bir klasör yeniden
+    listelenmez, kayıtlı alt klasörleri üzerinden devam edilir. Böylece
+    değişmeyen alt ağaçlar için yalnızca klasör başına tek bir stat yapılır.
+
+    Not: Klasör mtime'ı yalnızca dosya ekleme/silme/yeniden adlandırmada
+    değişir; yerinde düzenlenen bir dosyanın boyut/mtime bilgisi o klasör
+    yeniden taranana kadar eski kalır (eşleştirme analizi bundan etkilenmez).
+    """
+
+    def __init__(self, root_dir, index_path=None):
+        self.root_dir = root_dir
+        self.index_path = index_path or os.path.join(self.root_dir, DEFAULT_INDEX_NAME)
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------ tarama
+    @staticmethod
+    def _file_kind(dir_name, ext):
+        dir_name = dir_name.lower()
+        if dir_name == "images" and ext in IMAGE_EXTS:
+            return "image"
+        if dir_name == "labels" and ext == LABEL_EXT:
+            return "label"
+        return None
+
+    def refresh(self):
+        """
+        İndeksi disk ile eşitler ve {'scanned', 'skipped', 'removed'} döndürür.
+        """
+        stored = {path: (mtime, json.loads(subdirs))
+                  for path, mtime, subdirs in self.conn.execute("SELECT path, mtime_ns, subdirs FROM dirs")}
+        stats = {"scanned": 0, "skipped": 0, "removed": 0}
+        seen = set()
+        stack = [""]
+
+        with self.conn:
+            while stack:
+                rel = stack.pop()
+                full = os.path.join(self.root_dir, rel)
+                try:
+                    mtime = os.stat(full).st_mtime_ns
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                seen.add(rel)
+
+                cached = stored.get(rel)
+                if cached is not None and cached[0] == mtime:
+                    stats["skipped"] += 1
+                    stack.extend(os.path.join(rel, d) for d in cached[1])
+                    continue
+
+                stats["scanned"] += 1
+                subdirs, rows = [], []
+                dir_name = os.path.basename(full)
+                class_folder = os.path.dirname(rel)
+                with os.scandir(full) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            continue
+                        stem, ext = os.path.splitext(entry.name)
+                        kind = self._file_kind(dir_name, ext.lower())
+                        if kind is None or not entry.is_file():
+                            continue
+                        st = entry.stat()
+                        rows.append((rel, entry.name, class_folder, kind, os.path.normcase(stem),
+                                     ext, st.st_size, st.st_mtime_ns))
+
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (rel,))
+                self.conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (rel, mtime, json.dumps(subdirs)))
+                stack.extend(os.path.join(rel, d) for d in subdirs)
+
+            # Artık var olmayan klasörleri ve dosyalarını temizle
+            for rel in set(stored) - seen:
+                self.conn.execute("DELETE FROM dirs WHERE path = ?", (rel,))
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (rel,))
+                stats["removed"] += 1
+        return stats
+
+    # ------------------------------------------------------------------ sorgular
+    def _abs(self, *parts):
+        return os.path.normpath(os.path.join(self.root_dir, *parts))
+
+    def class_stats(self):
+        """
+        superApp.analyze_dataset ile aynı yapıda istatistik döndürür:
+        {class_path: {images, labels, missing_labels, missing_images}}
+        """
+        class_stats = {}
+
+        def stats_for(class_folder):
+            return class_stats.setdefault(self._abs(class_folder), {
+                "images": 0, "labels": 0, "missing_labels": [], "missing_images": []})
+
+        for class_folder, kind, count in self.conn.execute(
+                "SELECT class_folder, kind, COUNT(*) FROM files GROUP BY class_folder, kind ORDER BY class_folder"):
+            stats_for(class_folder)["images" if kind == "image" else "labels"] = count
+
+        for class_folder, d, name in self.missing_pairs("image"):
+            stats_for(class_folder)["missing_labels"].append(self._abs(d, name))
+        for class_folder, d, name in self.missing_pairs("label"):
+            stats_for(class_folder)["missing_images"].append(self._abs(d, name))
+        return class_stats
+
+    def missing_pairs(self, kind):
+        """Eşi olmayan 'image' veya 'label' kayıtlarını (class_folder, dir, name) olarak döndürür."""
+        other = "label" if kind == "image" else "image"
+        return self.conn.execute(
+            """SELECT f.class_folder, f.dir, f.name FROM files f
+               WHERE f.kind = ? AND NOT EXISTS (
+                   SELECT 1 FROM files o
+                   WHERE o.class_folder = f.class_folder AND o.kind = ? AND o.stem = f.stem)
+               ORDER BY f.dir, f.name""", (kind, other)).fetchall()
+
+    def pairs(self):
+        """Eşleşen (class_folder, görüntü yolu, label yolu) üçlülerini döndürür."""
+        rows = self.conn.execute(
+            """SELECT i.class_folder, i.dir, i.name, l.dir, l.name FROM files i
+               JOIN files l ON l.class_folder = i.class_folder AND l.kind = 'label' AND l.stem = i.stem
+               WHERE i.kind = 'image' ORDER BY i.dir, i.name""")
+        return [(cf, self._abs(idir, iname), self._abs(ldir, lname)) for cf, idir, iname, ldir, lname in rows]
+
+    def unlabeled_images(self):
+        """Label dosyası olmayan (arka plan) görselleri (class_folder, görüntü yolu) olarak döndürür."""
+        return [(cf, self._abs(d, name)) for cf, d, name in self.missing_pairs("image")]
+
+    def remove_files(self, paths):
+        """Diskten silinen dosyaları tek bir işlemde (transaction) indeksten de düşer."""
+        rels = [os.path.relpath(p, self.root_dir) for p in paths]
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE dir = ? AND name = ?",
+                                  [(os.path.dirname(rel), os.path.basename(rel)) for rel in rels])
+
+
+def analyze_with_index(root_dir, delete_missing=False, index_path=None):
+    """
+    analyze_dataset'in indeks kullanan sürümü. (class_stats, deleted_files, refresh_stats) döndürür.
+    """
+    start = time.perf_counter()
+    with DatasetIndex(root_dir, index_path) as index:
+        refresh_stats = index.refresh()
+        class_stats = index.class_stats()
+        deleted_files = []
+        if delete_missing:
+            for stats in class_stats.values():
+                for path in stats["missing_labels"] + stats["missing_images"]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    deleted_files.append(path)
+            index.remove_files(deleted_files)
+    refresh_stats["seconds"] = time.perf_counter() - start
+    return class_stats, deleted_files, refresh_stats
@@ -0,0 +1,308 @@
+import os
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+PARTIAL_BYTES = 64 * 1024  # tam hash'ten önce yalnızca ilk 64 KB karşılaştırılır
+
+
+# ------------------------------------------------------------------ tarama
+def find_images(root_dir):
+    """
+    root_dir altındaki tüm görselleri {yol, boyut, label} kayıtları olarak listeler.
+    Label, YOLO düzenindeki kardeş labels/ klasöründe aranır (yoksa None).
+    """
+    records = []
+    stack = [root_dir]
+    while stack:
+        dirpath = stack.pop()
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                stack.append(e.path)
+            elif e.name.lower().endswith(IMAGE_EXTS):
+                label = None
+                if os.path.basename(dirpath).lower() == "images":
+                    candidate = os.path.join(os.path.dirname(dirpath), "labels", os.path.splitext(e.name)[0] + ".txt")
+                    label = candidate if os.path.exists(candidate) else None
+                records.append({"path": e.path, "size": e.stat().st_size, "label": label})
+    records.sort(key=lambda r: r["path"])
+    return records
+
+
+# ------------------------------------------------------------------ birebir kopyalar
+def _file_digest(args):
+    path, limit = args
+    h = hashlib.blake2b(digest_size=16)
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def _group_by(records, key_fn, workers, desc):
+    keys = []
+    if records:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            keys = list(tqdm(executor.map(key_fn, records), total=len(records), desc=desc))
+    groups = defaultdict(list)
+    for r, k in zip(records, keys):
+        groups[k].append(r)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def find_exact_duplicates(records, workers=8):
+    """
+    Birebir aynı dosyaları bulur: önce boyuta göre gruplar (tekil boyutlar hiç
+    okunmaz), sonra ilk 64 KB'ın hash'i, en son tüm dosyanın akış halinde
+    (streamed) hash'i ile daraltır. [[kayıt, ...], ...] döndürür.
+    """
+    by_size = defaultdict(list)
+    for r in records:
+        by_size[r["size"]].append(r)
+    candidates = [r for g in by_size.values() if len(g) > 1 for r in g]
+
+    groups = []
+    for size_group in _group_by(candidates, lambda r: (r["size"], _file_digest((r["path"], PARTIAL_BYTES))),
+                                workers, "Kısmi hash"):
+        if size_group[0]["size"] <= PARTIAL_BYTES:
+            groups.append(size_group)  # dosyanın tamamı zaten hash'lendi
+        else:
+            groups.extend(_group_by(size_group, lambda r: _file_digest((r["path"], None)), workers, "Tam hash"))
+    return groups
+
+
+# ------------------------------------------------------------------ algısal hash
+def _read_gray(path):
+    # JPEG'lerde IMREAD_REDUCED_* DCT ölçeklemesi ile 1/8 boyutta, hızlı çözülür
+    img = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None or min(img.shape) < 8:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    return img
+
+
+def dhash(img, size=8):
+    """Fark hash'i: komşu piksellerin parlaklık farkının işaretleri (64 bit)."""
+    small = cv2.resize(img, (size + 1, size), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(img, size=8, highfreq=4):
+    """DCT tabanlı algısal hash: düşük frekans katsayılarının medyana göre işaretleri (64 bit)."""
+    n = size * highfreq
+    small = cv2.resize(img, (n, n), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:size, :size]
+    return _bits_to_int(low > np.median(low.flatten()[1:]))
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+HASHERS = {"dhash": dhash, "phash": phash}
+
+
+def _perceptual_hash(args):
+    path, method = args
+    img = _read_gray(path)
+    if img is None:
+        return None
+    return HASHERS[method](img)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Hamming uzaklığı için BK-ağacı. radius içindeki komşuları bulurken
+    üçgen eşitsizliği ile |d - r| dışındaki dalları hiç gezmez; böylece
+    sorgular tüm çiftleri karşılaştırmaktan (O(n²)) çok daha hızlıdır.
+    """
+
+    def __init__(self):
+        self.root = None  # (hash, [değerler], {uzaklık: alt düğüm})
+
+    def add(self, key, value):
+        if self.root is None:
+            self.root = (key, [value], {})
+            return
+        node = self.root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, [value], {})
+                return
+            node = child
+
+    def query(self, key, radius):
+        """radius içindeki (uzaklık, değer) çiftlerini döndürür."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_key, values, children = stack.pop()
+            d = hamming(key, node_key)
+            if d <= radius:
+                found.extend((d, v) for v in values)
+            for child_d, child in children.items():
+                if d - radius <= child_d <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def find_near_duplicates(records, method="dhash", radius=4, workers=None):
+    """
+    Algısal hash'leri süreç havuzunda paralel hesaplar ve radius içindeki
+    görselleri group_near_duplicates ile gruplar. [[kayıt, ...], ...] döndürür.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashes = list(tqdm(executor.map(_perceptual_hash, [(r["path"], method) for r in records], chunksize=32),
+                           total=len(records), desc=f"{method} hesaplanıyor"))
+    return group_near_duplicates(records, hashes, radius)
+
+
+def group_near_duplicates(records, hashes, radius=4):
+    """
+    Kayıtları tutulacak görsel etrafında gruplar: görseller _keep_priority
+    sırasıyla gezilir, henüz bir gruba girmemiş her görsel kendi grubunu açar
+    ve yalnızca ona radius içinde olan, atanmamış komşularını alır. Geçişli
+    birleştirme (A~B~C ... ~Z) yapılmaz; bir gruptaki her görsel tutulan
+    görsele en fazla radius uzaklıktadır. Hash'i None olanlar atlanır.
+    """
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        if h is not None:
+            records[i]["hash"] = f"{h:016x}"
+            tree.add(h, i)
+
+    order = sorted((i for i, h in enumerate(hashes) if h is not None), key=lambda i: _keep_priority(records[i]))
+    assigned = set()
+    groups = []
+    for i in order:
+        if i in assigned:
+            continue
+        assigned.add(i)
+        members = sorted(j for _, j in tree.query(hashes[i], radius) if j not in assigned)
+        assigned.update(members)
+        if members:
+            groups.append([records[i]] + [records[j] for j in members])
+    return groups
+
+
+# ------------------------------------------------------------------ silme planı
+def _keep_priority(record):
+    # Label'ı olan, daha büyük dosya ve alfabetik olarak ilk yol tutulur
+    return (record["label"] is None, -record["size"], record["path"])
+
+
+def build_deletion_plan(groups, kind):
+    """Her grupta bir görsel tutulur; diğerleri label'larıyla birlikte silinecekler listesine girer."""
+    plan = []
+    for group in groups:
+        ordered = sorted(group, key=_keep_priority)
+        plan.append({
+            "kind": kind,
+            "keep": ordered[0]["path"],
+            "keep_label": ordered[0]["label"],
+            "delete": [{"image": r["path"], "label": r["label"], "hash": r.get("hash")} for r in ordered[1:]],
+        })
+    return plan
+
+
+def protect_shared_labels(plan, records):
+    """
+    Label'lar kök isimle eşleştiği için aynı klasördeki a.jpg ve a.png aynı
+    labels/a.txt'yi paylaşır. Silinecek bir görselin label'ını silinmeyen
+    (tutulan ya da hiç gruba girmeyen) bir görsel de kullanıyorsa label
+    plandan çıkarılır. Korunan label sayısını döndürür.
+    """
+    deleted = {item["image"] for group in plan for item in group["delete"]}
+    kept_labels = {r["label"] for r in records if r["label"] and r["path"] not in deleted}
+    protected = 0
+    for group in plan:
+        for item in group["delete"]:
+            if item["label"] in kept_labels:
+                item["label"] = None
+                protected += 1
+    return protected
+
+
+def apply_plan(plan):
+    # Ek güvence: plan elle düzenlenmiş olsa da tutulan görsellerin label'ı silinmez
+    kept_labels = {group.get("keep_label") for group in plan}
+    deleted = 0
+    for group in plan:
+        for item in group["delete"]:
+            label = item["label"] if item["label"] not in kept_labels else None
+            for path in (item["image"], label):
+                if path and os.path.exists(path):
+                    os.remove(path)
+                    deleted += 1
+    return deleted
+
+
+def find_duplicate_images(root_dir, near=True, method="dhash", radius=4, workers=8):
+    """
+    Birebir ve (near=True ise) algısal olarak benzer kopyaları bulur ve silme
+    planını döndürür. Birebir kopyalardan yalnızca tutulan görsel algısal
+    aramaya girer; böylece aynı dosya iki kez raporlanmaz.
+    """
+    records = find_images(root_dir)
+    print(f"🔎 {len(records)} görsel bulundu.")
+
+    exact = find_exact_duplicates(records, workers=workers)
+    plan = build_deletion_plan(exact, "exact")
+    print(f"🟰 Birebir kopya grubu: {len(exact)} ({sum(len(g['delete']) for g in plan)} fazla görsel)")
+
+    if near:
+        dropped = {item["image"] for g in plan for item in g["delete"]}
+        remaining = [r for r in records if r["path"] not in dropped]
+        similar = find_near_duplicates(remaining, method=method, radius=radius, workers=workers)
+        near_plan = build_deletion_plan(similar, method)
+        print(f"≈  Benzer görsel grubu ({method}, radius={radius}): {len(similar)} "
+              f"({sum(len(g['delete']) for g in near_plan)} fazla görsel)")
+        plan += near_plan
+
+    shared = protect_shared_labels(plan, records)
+    if shared:
+        print(f"🔒 {shared} label tutulan bir görselle paylaşıldığı için silinmeyecek.")
+    return plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Birebir ve algısal olarak benzer (near-duplicate) görselleri bulur.")
+    parser.add_argument("--path", type=str, default=".", help="Taranacak ana klasör")
+    parser.add_argument("--method", choices=sorted(HASHERS), default="dhash", help="Algısal hash yöntemi")
+    parser.add_argument("--radius", type=int, default=4, help="Benzer sayılacak en büyük Hamming uzaklığı (64 bit üzerinden)")
+    parser.add_argument("--exact-only", action="store_true", help="Yalnızca birebir kopyaları bul")
+    parser.add_argument("--workers", type=int, default=8, help="Paralel iş parçacığı/süreç sayısı")
+    parser.add_argument("--report", type=str, default="duplicate_plan.json", help="Silme planının yazılacağı JSON dosyası")
+    parser.add_argument("--apply", action="store_true", help="Plandaki görselleri ve label'larını sil")
+    args = parser.parse_args()
+
+    plan = find_duplicate_images(args.path, near=not args.exact_only, method=args.method,
+                                 radius=args.radius, workers=args.workers)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+    print(f"📝 Silme planı yazıldı: {args.report}")
+
+    if args.apply:
+        print(f"🗑️  {apply_plan(plan)} dosya silindi.")
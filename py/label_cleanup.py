@@ -0,0 +1,349 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+MATRIX_MAX_BOXES = 2048  # bu sayıya kadar tüm IoU matrisi tek seferde hesaplanır (~32 MB)
+QUERY_BLOCK_ELEMS = 1 << 22  # komşu sorgusunda tek seferde hesaplanan en fazla uzaklık sayısı (~32 MB)
+
+
+def read_label_lines(filepath):
+    """
+    YOLO label dosyasını okur. (classes, boxes, satırlar) döndürür:
+    boxes Python float listesi olarak da tutulur ki yazarken orijinal
+    str(float) biçimi birebir korunsun. Boş satırlar atlanır.
+    """
+    classes, boxes, originals = [], [], []
+    with open(filepath, "r") as f:
+        for line in f:
+            parts = line.strip().split()
+            if not parts:
+                continue
+            classes.append(int(float(parts[0])))
+            boxes.append(list(map(float, parts[1:5])))
+            originals.append(line.strip())
+    return classes, boxes, originals
+
+
+def _corners(boxes):
+    """(N, 4) cx, cy, w, h -> x_min, y_min, x_max, y_max ve alan."""
+    cx, cy, w, h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    x_min, y_min = cx - w / 2, cy - h / 2
+    x_max, y_max = cx + w / 2, cy + h / 2
+    return x_min, y_min, x_max, y_max, (x_max - x_min) * (y_max - y_min)
+
+
+def iou_one_to_many(i, corners, others):
+    """i. kutunun others indexlerindeki kutularla IoU'su (compute_iou ile aynı işlem sırası)."""
+    x_min, y_min, x_max, y_max, area = corners
+    inter_w = np.maximum(0, np.minimum(x_max[i], x_max[others]) - np.maximum(x_min[i], x_min[others]))
+    inter_h = np.maximum(0, np.minimum(y_max[i], y_max[others]) - np.maximum(y_min[i], y_min[others]))
+    inter = inter_w * inter_h
+    union = area[i] + area[others] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+def pairwise_iou(corners):
+    """Tüm kutular arası (N, N) IoU matrisi; satır i, compute_iou(box_i, box_j) ile aynıdır."""
+    x_min, y_min, x_max, y_max, area = corners
+    inter_w = np.maximum(0, np.minimum(x_max[:, None], x_max[None, :]) - np.maximum(x_min[:, None], x_min[None, :]))
+    inter_h = np.maximum(0, np.minimum(y_max[:, None], y_max[None, :]) - np.maximum(y_min[:, None], y_min[None, :]))
+    inter = inter_w * inter_h
+    union = area[:, None] + area[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+def dedup_boxes(classes, boxes, iou_threshold=0.7, class_aware=False):
+    """
+    Dosya sırasına göre açgözlü (greedy) NMS: tutulan her kutu, kendisinden
+    sonra gelen ve IoU'su iou_threshold'dan büyük olan kutuları siler.
+    class_aware=True ise yalnızca aynı sınıftaki kutular birbirini siler.
+
+    Tüm kutular tek bir (N, 4) dizide tutulur. MATRIX_MAX_BOXES'a kadar
+    IoU matrisi tek seferde hesaplanır ve döngü yalnızca satır maskelerini
+    birleştirir; daha büyük dosyalarda her tutulan kutu için geri kalanlarla
+    IoU tek vektörel işlemle hesaplanır (N×N matris tutulmaz).
+
+    Returns:
+        (keep index listesi, [(silinen index, tutan index, IoU), ...])
+    """
+    n = len(boxes)
+    if n == 0:
+        return [], []
+    arr = np.asarray(boxes, dtype=np.float64).reshape(n, 4)
+    cls = np.asarray(classes)
+    corners = _corners(arr)
+    suppressed = np.zeros(n, dtype=bool)
+    keep, removed = [], []
+
+    if n <= MATRIX_MAX_BOXES:
+        ious = pairwise_iou(corners)
+        over = np.triu(ious > iou_threshold, k=1)  # yalnızca sonra gelen kutular silinebilir
+        if class_aware:
+            over &= cls[:, None] == cls[None, :]
+        for i in range(n):
+            if suppressed[i]:
+                continue
+            keep.append(i)
+            hit = over[i] & ~suppressed
+            if hit.any():
+                idx = np.flatnonzero(hit)
+                suppressed[idx] = True
+                removed.extend((int(j), i, float(ious[i, j])) for j in idx)
+        return keep, removed
+
+    for i in range(n):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        others = np.flatnonzero(~suppressed[i + 1:]) + i + 1
+        if class_aware:
+            others = others[cls[others] == cls[i]]
+        if not len(others):
+            continue
+        ious = iou_one_to_many(i, corners, others)
+        hit = ious > iou_threshold
+        suppressed[others[hit]] = True
+        removed.extend((int(j), i, float(v)) for j, v in zip(others[hit], ious[hit]))
+    return keep, removed
+
+
+def remove_duplicates_from_file(filepath, iou_threshold=1, class_aware=False, verbose=True):
+    """
+    Label dosyasındaki kopya kutuları siler ve dosyayı yeniden yazar
+    (çıktı biçimi notebook'taki sürümle birebir aynıdır). Silinen kutu sayısını döndürür.
+    """
+    classes, boxes, originals = read_label_lines(filepath)
+    keep, removed = dedup_boxes(classes, boxes, iou_threshold, class_aware)
+    if verbose:
+        for j, _, iou in removed:
+            print(f"[{os.path.basename(filepath)}] Silinen: {originals[j]}  (IoU={iou:.2f})")
+
+    with open(filepath, 'w') as f:
+        for i in keep:
+            f.write(f"{classes[i]} {' '.join(map(str, boxes[i]))}\n")
+    return len(removed)
+
+
+# ------------------------------------------------------------------ komşu oylaması
+class CenterGrid:
+    """
+    Kutu merkezleri üzerinde düzgün ızgara (uniform grid) indeksi.
+    Sorgular hücre hücre toplu (batched) yapılır: bir hücredeki tüm kutuların
+    çevre hücrelerdeki adaylara uzaklığı tek vektörel işlemle hesaplanır;
+    böylece her kutu yalnızca yakınındaki kutularla karşılaştırılır.
+    Komşular (uzaklık, index) sırasıyla döner; notebook'taki kararlı
+    sıralamayla aynıdır (eşit uzaklıkta küçük index önce gelir).
+    """
+
+    def __init__(self, centers, cell):
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.cell = float(cell)
+        keys = np.floor(self.centers / self.cell).astype(np.int64)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        cell_keys, starts, counts = np.unique(keys[order], axis=0, return_index=True, return_counts=True)
+        self.cells = {(int(x), int(y)): order[s:s + c] for (x, y), s, c in zip(cell_keys, starts, counts)}
+        self.lo, self.hi = (cell_keys.min(axis=0), cell_keys.max(axis=0)) if len(cell_keys) else (0, 0)
+
+    @classmethod
+    def for_knn(cls, centers, k):
+        """Hücre boyu, bir hücreye ortalama k+1 merkez düşecek şekilde seçilir."""
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        extent = np.ptp(centers, axis=0) if len(centers) else np.zeros(2)
+        n = max(len(centers), 1)
+        cell = max(np.sqrt(extent[0] * extent[1] * (k + 1) / n), extent.max() * (k + 1) / n, 1e-12)
+        return cls(centers, cell)
+
+    @classmethod
+    def for_radius(cls, centers, radius):
+        # Hücre yarıçaptan çok az büyük: yarıçap içindeki her merkez 3x3 komşulukta kalır
+        return cls(centers, max(radius, 0.0) * (1 + 1e-6) + 1e-12)
+
+    def _block(self, key, r):
+        """key hücresinin r halkası içindeki tüm merkezlerin indexleri."""
+        x, y = key
+        if (2 * r + 1) ** 2 <= len(self.cells):
+            parts = [self.cells[c] for c in ((x + dx, y + dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1))
+                     if c in self.cells]
+        else:
+            parts = [idx for (cx, cy), idx in self.cells.items() if abs(cx - x) <= r and abs(cy - y) <= r]
+        return np.concatenate(parts)
+
+    def _covers_all(self, key, r):
+        return (key[0] - r <= self.lo[0] and key[1] - r <= self.lo[1]
+                and key[0] + r >= self.hi[0] and key[1] + r >= self.hi[1])
+
+    def _sorted_distances(self, queries, candidates):
+        """(len(queries), len(candidates)) uzaklıklar, her satır (uzaklık, index) sırasında; kendisi inf."""
+        q, c = self.centers[queries], self.centers[candidates]
+        d = np.hypot(q[:, 0, None] - c[None, :, 0], q[:, 1, None] - c[None, :, 1])
+        d[queries[:, None] == candidates[None, :]] = np.inf
+        idx = np.broadcast_to(candidates, d.shape)
+        order = np.lexsort((idx, d), axis=-1)
+        return np.take_along_axis(d, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+    def _chunks(self, queries, n_candidates):
+        step = max(1, QUERY_BLOCK_ELEMS // max(n_candidates, 1))
+        for s in range(0, len(queries), step):
+            yield queries[s:s + step]
+
+    def knn(self, k, queries=None):
+        """{index: (komşu indexleri, uzaklıklar)} — her sorgu için en yakın k merkez (kendisi hariç)."""
+        wanted = None if queries is None else np.zeros(len(self.centers), dtype=bool)
+        if wanted is not None:
+            wanted[np.asarray(queries, dtype=np.int64)] = True
+        result = {}
+        for key, members in self.cells.items():
+            pending = members if wanted is None else members[wanted[members]]
+            r = 1
+            while len(pending):
+                candidates = self._block(key, r)
+                full = self._covers_all(key, r)
+                # halkanın dışındaki her merkez en az r hücre uzaktadır
+                bound = (r - 1e-6) * self.cell
+                unresolved = []
+                for chunk in self._chunks(pending, len(candidates)):
+                    d, idx = self._sorted_distances(chunk, candidates)
+                    n_valid = len(candidates) - 1
+                    kth = d[:, k - 1] if n_valid >= k else np.full(len(chunk), np.inf)
+                    done = np.full(len(chunk), True) if full else kth < bound
+                    take = min(k, n_valid)
+                    for row in np.flatnonzero(done):
+                        result[int(chunk[row])] = (idx[row, :take], d[row, :take])
+                    unresolved.append(chunk[~done])
+                pending = np.concatenate(unresolved)
+                r += 1
+        return result
+
+    def radius_neighbors(self, radius, queries=None):
+        """{index: (komşu indexleri, uzaklıklar)} — uzaklığı radius'a eşit/küçük merkezler (kendisi hariç)."""
+        wanted = None if queries is None else np.zeros(len(self.centers), dtype=bool)
+        if wanted is not None:
+            wanted[np.asarray(queries, dtype=np.int64)] = True
+        result = {}
+        for key, members in self.cells.items():
+            pending = members if wanted is None else members[wanted[members]]
+            if not len(pending):
+                continue
+            candidates = self._block(key, 1)
+            for chunk in self._chunks(pending, len(candidates)):
+                d, idx = self._sorted_distances(chunk, candidates)
+                counts = (d <= radius).sum(axis=1)
+                for row, cnt in enumerate(counts):
+                    result[int(chunk[row])] = (idx[row, :cnt], d[row, :cnt])
+        return result
+
+
+def read_vote_entries(filepath):
+    """Oylama için label dosyasını okur: (classes, boxes, confs); conf yoksa None."""
+    classes, boxes, confs = [], [], []
+    with open(filepath) as f:
+        for line in f:
+            p = line.split()
+            if not p:
+                continue
+            classes.append(int(float(p[0])))
+            boxes.append(tuple(map(float, p[1:5])))
+            confs.append(float(p[5]) if len(p) > 5 else None)
+    return classes, boxes, confs
+
+
+def vote_classes(classes, centers, k=5, radius=None, alpha=0.75, weight=True, protected=(4,)):
+    """
+    Her kutunun sınıfını komşularının oyuyla yeniden belirler (notebook'taki
+    komsu_oylama ile aynı kurallar). Komşular CenterGrid ile toplu sorgulanır;
+    oylar her zaman orijinal sınıflarla verilir. Yeni sınıf listesini döndürür.
+    """
+    n = len(classes)
+    queries = [i for i in range(n) if classes[i] not in protected]
+    if not queries or n < 2:
+        return list(classes)
+    if radius is not None:
+        neighbors = CenterGrid.for_radius(centers, radius).radius_neighbors(radius, queries)
+    else:
+        neighbors = CenterGrid.for_knn(centers, k).knn(k, queries) if k > 0 else {}
+
+    new_cls = list(classes)
+    for i in queries:
+        idx, dist = neighbors.get(i, ((), ()))
+        if not len(idx):
+            continue
+        scores = {}
+        for j, d in zip(idx.tolist(), dist.tolist()):
+            scores[classes[j]] = scores.get(classes[j], 0.0) + (1.0 / (d + 1e-6) if weight else 1.0)
+        # eşitlikte ilk eklenen (en yakın komşunun) sınıfı kazanır
+        winner, win_score = max(scores.items(), key=lambda x: x[1])
+        if win_score / sum(scores.values()) >= alpha:
+            new_cls[i] = winner
+    return new_cls
+
+
+def komsu_oylama(filepath, k=5, radius=None, alpha=0.75, weight=True, protected=(4,)):
+    """
+    • radius=None  → k-en yakın; radius=px  → yarıçap içinde
+    • weight=True  → 1/dist ağırlıklı oy; False → düz sayım
+    • alpha        → baskın sınıf oran eşiği (0–1). Karşılanmazsa kutu değişmez
+    • protected    → sınıfı hiç değiştirilmeyen sınıflar (varsayılan: class 4)
+    Dosyayı notebook'taki biçimde yeniden yazar, sınıfı değişen kutu sayısını döndürür.
+    """
+    classes, boxes, confs = read_vote_entries(filepath)
+    centers = np.asarray([b[:2] for b in boxes], dtype=np.float64).reshape(-1, 2)
+    new_cls = vote_classes(classes, centers, k, radius, alpha, weight, protected)
+
+    with open(filepath, "w") as f:
+        for cls, box, conf in zip(new_cls, boxes, confs):
+            line = f"{cls} {' '.join(f'{x:.6f}' for x in box)}"
+            if conf is not None:
+                line += f" {conf:.6f}"
+            f.write(line + "\n")
+    return sum(a != b for a, b in zip(classes, new_cls))
+
+
+# ------------------------------------------------------------------ klasör sürücüleri
+def _label_files(labels_folder):
+    return sorted(os.path.join(labels_folder, f) for f in os.listdir(labels_folder)
+                  if f.endswith('.txt') and f != "classes.txt")
+
+
+def _dedup_job(args):
+    filepath, iou_threshold, class_aware = args
+    return filepath, remove_duplicates_from_file(filepath, iou_threshold, class_aware, verbose=False)
+
+
+def process_labels_folder(labels_folder, iou_threshold=0.7, class_aware=False, workers=None):
+    """
+    Klasördeki tüm label dosyalarını (classes.txt hariç) süreç havuzunda
+    işler. {dosya adı: silinen kutu sayısı} döndürür.
+    """
+    files = _label_files(labels_folder)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [(path, iou_threshold, class_aware) for path in files]
+        for filepath, n_removed in executor.map(_dedup_job, jobs, chunksize=64):
+            results[os.path.basename(filepath)] = n_removed
+    total = sum(results.values())
+    print(f"Tamamlandı: {len(results)} dosya, {total} kopya kutu silindi "
+          f"({sum(1 for v in results.values() if v)} dosya değişti)")
+    return results
+
+
+def _vote_job(args):
+    filepath, k, radius, alpha, weight, protected = args
+    return filepath, komsu_oylama(filepath, k, radius, alpha, weight, protected)
+
+
+def vote_labels_folder(labels_folder, k=5, radius=None, alpha=0.75, weight=True, protected=(4,), workers=None):
+    """
+    Klasördeki tüm label dosyalarına komşu oylamasını süreç havuzunda uygular.
+    {dosya adı: sınıfı değişen kutu sayısı} döndürür.
+    """
+    files = _label_files(labels_folder)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [(path, k, radius, alpha, weight, tuple(protected)) for path in files]
+        for filepath, n_changed in executor.map(_vote_job, jobs, chunksize=64):
+            results[os.path.basename(filepath)] = n_changed
+    print(f"Oylama tamamlandı: {len(results)} dosya, {sum(results.values())} kutunun sınıfı değişti "
+          f"({sum(1 for v in results.values() if v)} dosya değişti)")
+    return results
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import numpy as np
+
+DEFAULT_CACHE_NAME = ".label_cache"
+
+
+class LabelTable:
+    """
+    Tüm YOLO etiketlerinin kolon bazlı (columnar) NumPy gösterimi.
+
+    classes  : (N,)   int32   - her kutunun sınıf ID'si
+    xywh     : (N, 4) float32 - cx, cy, w, h (normalize)
+    file_idx : (N,)   int32   - kutunun ait olduğu label dosyasının indexi (sıralı)
+    files    : [göreli label yolu, ...]
+    folders  : [göreli labels klasörü, ...]
+    file_folder : (F,) int32  - her dosyanın klasör indexi
+    """
+
+    def __init__(self, root_dir, files, classes, xywh, file_idx, label_dirs=()):
+        self.root_dir = root_dir
+        self.files = files
+        self.classes = classes
+        self.xywh = xywh
+        self.file_idx = file_idx
+        # label_dirs: boş labels klasörleri de raporda görünsün diye ayrıca verilir
+        self.folders = sorted({os.path.dirname(f) for f in files} | set(label_dirs))
+        folder_pos = {d: i for i, d in enumerate(self.folders)}
+        self.file_folder = np.array([folder_pos[os.path.dirname(f)] for f in files], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.classes)
+
+    @property
+    def box_folder(self):
+        return self.file_folder[self.file_idx]
+
+    def class_histogram(self):
+        """{sınıf ID: kutu sayısı}"""
+        ids, counts = np.unique(self.classes, return_counts=True)
+        return dict(zip(ids.tolist(), counts.tolist()))
+
+    def folder_class_counts(self):
+        """(klasör sayısı, sınıf sayısı) boyutunda kutu sayısı matrisi ve sınıf ID listesi."""
+        ids, cls_pos = np.unique(self.classes, return_inverse=True)
+        counts = np.zeros((len(self.folders), len(ids)), dtype=np.int64)
+        np.add.at(counts, (self.box_folder, cls_pos), 1)
+        return counts, ids.tolist()
+
+    def files_per_folder(self):
+        return np.bincount(self.file_folder, minlength=len(self.folders))
+
+    def sample_files(self):
+        """{(klasör indexi, sınıf ID): o sınıfı içeren ilk label dosyası}"""
+        if not len(self):
+            return {}
+        key = self.box_folder.astype(np.int64) * (int(self.classes.max()) + 1) + self.classes
+        # file_idx artan sırada olduğundan her anahtarın ilk görüldüğü yer en küçük dosya indexidir
+        _, first = np.unique(key, return_index=True)
+        return {(int(self.box_folder[i]), int(self.classes[i])): self.files[self.file_idx[i]] for i in first}
+
+    def box_size_summary(self, percentiles=(5, 25, 50, 75, 95)):
+        """Genişlik, yükseklik ve alan (normalize) için yüzdelik değerleri."""
+        if not len(self):
+            return {}
+        w = self.xywh[:, 2].astype(np.float64)
+        h = self.xywh[:, 3].astype(np.float64)
+        return {
+            "w": np.percentile(w, percentiles).tolist(),
+            "h": np.percentile(h, percentiles).tolist(),
+            "area": np.percentile(w * h, percentiles).tolist(),
+            "percentiles": list(percentiles),
+        }
+
+
+def _scan_label_files(root_dir):
+    """
+    root_dir altındaki tüm labels/*.txt dosyalarını (göreli yol, boyut, mtime)
+    olarak ve bulunan labels klasörlerini (göreli yol) listeler.
+    """
+    found, label_dirs = [], []
+    stack = [root_dir]
+    while stack:
+        dirpath = stack.pop()
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        is_labels = os.path.basename(dirpath).lower() == "labels"
+        if is_labels:
+            label_dirs.append(os.path.relpath(dirpath, root_dir))
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                if e.name != DEFAULT_CACHE_NAME:
+                    stack.append(e.path)
+            elif is_labels and e.name.lower().endswith(".txt") and e.name.lower() != "classes.txt":
+                st = e.stat()  # Windows'ta scandir ile birlikte gelir, ek sistem çağrısı yok
+                found.append((os.path.relpath(e.path, root_dir), st.st_size, st.st_mtime_ns))
+    found.sort()
+    return found, sorted(label_dirs)
+
+
+def _parse_label_file(path):
+    """Tek bir YOLO .txt dosyasını (classes, xywh) dizilerine çevirir; bozuk satırlar atlanır."""
+    rows = []
+    with open(path, "r", errors="ignore") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            try:
+                rows.append([float(x) for x in parts[:5]])
+            except ValueError:
+                continue
+    if not rows:
+        return np.empty(0, dtype=np.int32), np.empty((0, 4), dtype=np.float32)
+    arr = np.asarray(rows, dtype=np.float64)
+    return arr[:, 0].astype(np.int32), arr[:, 1:5].astype(np.float32)
+
+
+def read_yolo_boxes(path):
+    """
+    YOLO .txt dosyasını albumentations için (bboxes, class_labels) olarak okur.
+    Kutular [0, 1] aralığına kırpılır, alanı sıfır kalanlar atlanır
+    (albumentations geçersiz YOLO kutusunda hata verir).
+    """
+    classes, xywh = _parse_label_file(path)
+    x1 = np.clip(xywh[:, 0] - xywh[:, 2] / 2, 0.0, 1.0)
+    y1 = np.clip(xywh[:, 1] - xywh[:, 3] / 2, 0.0, 1.0)
+    x2 = np.clip(xywh[:, 0] + xywh[:, 2] / 2, 0.0, 1.0)
+    y2 = np.clip(xywh[:, 1] + xywh[:, 3] / 2, 0.0, 1.0)
+    keep = (x2 > x1) & (y2 > y1)
+    boxes = np.stack([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], axis=1)[keep]
+    return boxes.astype(np.float64).tolist(), classes[keep].tolist()
+
+
+def format_yolo_boxes(bboxes, class_labels):
+    """(bboxes, class_labels) çiftini YOLO .txt içeriğine çevirir."""
+    return "".join(f"{int(cls)} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n"
+                   for (cx, cy, w, h), cls in zip(bboxes, class_labels))
+
+
+def write_yolo_boxes(path, bboxes, class_labels):
+    """(bboxes, class_labels) çiftini YOLO .txt olarak yazar; kutu kalmadıysa boş dosya yazılır."""
+    with open(path, "w") as f:
+        f.write(format_yolo_boxes(bboxes, class_labels))
+
+
+def load_label_table(root_dir, cache_dir=None, verbose=True):
+    """
+    Tüm YOLO etiketlerini LabelTable olarak yükler.
+
+    Sonuçlar cache_dir altında .npy (memory-mapped okunur) ve files.json olarak
+    saklanır; her dosya boyut+mtime ile anahtarlanır. Değişmeyen dosyalar
+    yeniden ayrıştırılmaz, hiç değişiklik yoksa diziler doğrudan mmap edilir.
+    """
+    start = time.perf_counter()
+    cache_dir = cache_dir or os.path.join(root_dir, DEFAULT_CACHE_NAME)
+    files_json = os.path.join(cache_dir, "files.json")
+
+    cached_files, cached_dirs, cached = [], [], None
+    if os.path.exists(files_json):
+        try:
+            with open(files_json, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            cached_files = [tuple(x) for x in meta["files"]]
+            cached_dirs = meta["dirs"]
+            cached = {name: np.load(os.path.join(cache_dir, name + ".npy"), mmap_mode="r")
+                      for name in ("classes", "xywh", "file_idx")}
+        except (OSError, ValueError, KeyError, TypeError):
+            cached_files, cached_dirs, cached = [], [], None
+
+    current, label_dirs = _scan_label_files(root_dir)
+    files = [rel for rel, _, _ in current]
+
+    if cached is not None and current == cached_files and label_dirs == cached_dirs:
+        table = LabelTable(root_dir, files, cached["classes"], cached["xywh"], cached["file_idx"], label_dirs)
+        if verbose:
+            print(f"⚡ Label önbelleği kullanıldı: {len(files)} dosya, {len(table)} kutu "
+                  f"({time.perf_counter() - start:.2f} sn)")
+        return table
+
+    # Değişmeyen dosyaların dilimlerini eski diziden al, diğerlerini ayrıştır
+    old_pos = {}
+    if cached is not None:
+        bounds = np.searchsorted(cached["file_idx"], np.arange(len(cached_files) + 1))
+        old_pos = {entry: (bounds[i], bounds[i + 1]) for i, entry in enumerate(cached_files)}
+
+    cls_parts, xywh_parts, idx_parts = [], [], []
+    parsed = 0
+    for i, entry in enumerate(current):
+        if entry in old_pos:
+            a, b = old_pos[entry]
+            cls, xywh = np.array(cached["classes"][a:b]), np.array(cached["xywh"][a:b])
+        else:
+            cls, xywh = _parse_label_file(os.path.join(root_dir, entry[0]))
+            parsed += 1
+        cls_parts.append(cls)
+        xywh_parts.append(xywh)
+        idx_parts.append(np.full(len(cls), i, dtype=np.int32))
+
+    classes = np.concatenate(cls_parts) if cls_parts else np.empty(0, dtype=np.int32)
+    xywh = np.concatenate(xywh_parts) if xywh_parts else np.empty((0, 4), dtype=np.float32)
+    file_idx = np.concatenate(idx_parts) if idx_parts else np.empty(0, dtype=np.int32)
+
+    # Önbelleği yaz: önce .npy dosyaları, en son files.json (yarıda kalırsa önbellek geçersiz sayılır)
+    os.makedirs(cache_dir, exist_ok=True)
+    if os.path.exists(files_json):
+        os.remove(files_json)
+    cached = None  # Windows'ta mmap açıkken dosya değiştirilemez
+    for name, arr in (("classes", classes), ("xywh", xywh), ("file_idx", file_idx)):
+        np.save(os.path.join(cache_dir, name + ".npy"), arr)
+    tmp_json = files_json + ".tmp"
+    with open(tmp_json, "w", encoding="utf-8") as f:
+        json.dump({"files": current, "dirs": label_dirs}, f)
+    os.replace(tmp_json, files_json)
+
+    if verbose:
+        print(f"🔄 Label önbelleği güncellendi: {parsed} dosya ayrıştırıldı, "
+              f"{len(current) - parsed} dosya önbellekten ({time.perf_counter() - start:.2f} sn)")
+    return LabelTable(root_dir, files, classes, xywh, file_idx, label_dirs)
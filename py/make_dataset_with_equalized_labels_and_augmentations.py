@@ -1,9 +1,15 @@
 import os
 import shutil
 import random
-from glob import glob
+import queue
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import cv2
+import numpy as np
 import albumentations as A
+from materialize import is_jpeg, materialize, add_materialize_argument
 
 # --- AYARLAR ---
 source_dir = r"C:\Users\524ha\Desktop\AYGAZ_DATAS\Datasets\Ev1\Dataset"  # Ana klasör
@@ -13,6 +19,16 @@ train_split = 1500
 val_split = 250
 test_split = 0
 
+# Pipeline ayarları
+num_workers = os.cpu_count() or 4   # decode/augment/encode süreç sayısı
+io_threads = 4                      # okuma ve yazma aşamalarının her biri için iş parçacığı sayısı
+queue_size = 64                     # aşamalar arası kuyruk boyutu (bellekte bekleyen en fazla iş)
+max_aug_iterations = 5000           # sınıf başına en fazla augment sayısı
+materialize_mode = "auto"           # JPEG görsellerin çıktıya yerleştirilmesi (--materialize ile değiştirilebilir)
+jpeg_quality = 95                   # yeniden kodlanan (JPEG olmayan) ve augment edilen görsellerin kalitesi
+aug_chunk_size = 16                 # tek işte üretilen en fazla augment kopyası
+decode_cache_mb = 2048              # çözülmüş kaynak görseller için toplam bellek (işçilere bölünür)
+
 # Alt sınıflar
 classes = [
     "ev_kapakli_tbkli","ev_kapakli_tbksiz","ev_kapaksiz_tbkli","ev_kapaksiz_tbksiz",
@@ -35,6 +51,8 @@ transform = A.Compose([
     A.GaussianBlur(blur_limit=(3, 5), p=0.2),
 ])
 
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
 # --- FONKSİYONLAR ---
 def make_dirs(path, classes):
     for split in ["train", "val", "test"]:
@@ -42,129 +60,30 @@ def make_dirs(path, classes):
             os.makedirs(os.path.join(path, split, cls, "images"), exist_ok=True)
             os.makedirs(os.path.join(path, split, cls, "labels"), exist_ok=True)
 
-def ensure_jpg_and_copy_image(src_img, dst_img_path):
+def list_images(images_folder):
     """
-    Eğer src_img .png ise okuyup JPG olarak dst_img_path'e kaydeder.
-    Eğer zaten JPG ise doğrudan kopyalar.
-    dst_img_path full path (with .jpg)
-    """
-    _, ext = os.path.splitext(src_img)
-    ext = ext.lower()
-    if ext in [".png", ".jpeg", ".tif", ".tiff", ".bmp"]:
-        img = cv2.imread(src_img)
-        if img is None:
-            print(f"   ⚠️  Görsel okunamadı: {src_img}")
-            return False
-        # cv2.imwrite ile JPG olarak kaydet
-        cv2.imwrite(dst_img_path, img)
-        return True
-    else:
-        # zaten .jpg veya başka; kopyala (ama hedefin .jpg uzantılı olduğundan emin ol)
-        try:
-            shutil.copy(src_img, dst_img_path)
-            return True
-        except Exception as e:
-            print(f"   ⚠️  Kopyalama hatası: {src_img} -> {dst_img_path} | {e}")
-            return False
-
-def copy_image_and_label(src_img, src_label, dst_img_dir, dst_label_dir, new_name):
+    images/ klasörünü tek bir os.scandir ile listeler (uzantı başına ayrı glob yerine).
+    Windows'ta path'ler case-insensitive olabilir, bu yüzden lower() ile tekrarlar elenir.
     """
-    src_img: orijinal image path (herhangi uzantı)
-    src_label: orijinal label path (.txt)
-    dst_img_dir: hedef images klasörü
-    dst_label_dir: hedef labels klasörü
-    new_name: dosya adı (uzantısız)
-    """
-    os.makedirs(dst_img_dir, exist_ok=True)
-    os.makedirs(dst_label_dir, exist_ok=True)
-
-    dst_img_path = os.path.join(dst_img_dir, new_name + ".jpg")  # her zaman .jpg olarak kaydediyoruz
-    ok = ensure_jpg_and_copy_image(src_img, dst_img_path)
-    if not ok:
-        print(f"   ⚠️  Görsel atlandı: {src_img}")
-        return False
-
-    if os.path.exists(src_label):
-        try:
-            shutil.copy(src_label, os.path.join(dst_label_dir, new_name + ".txt"))
-        except Exception as e:
-            print(f"   ⚠️  Label kopyalama hatası: {src_label} -> {e}")
-            return False
-    else:
-        print(f"   ⚠️  Etiket bulunamadı: {src_label} (görsel kopyalandı ama etiketsiz)")
-        # etiket yoksa yine de devam et (isteğe göre burada False dönebilirsin)
-    return True
+    seen = set()
+    images = []
+    with os.scandir(images_folder) as it:
+        for entry in it:
+            if not entry.name.lower().endswith(IMAGE_EXTS) or not entry.is_file():
+                continue
+            key = os.path.normpath(entry.path).lower()
+            if key not in seen:
+                seen.add(key)
+                images.append(entry.path)
+    return sorted(images)
 
-def augment_and_save(src_img, src_label, dst_img_dir, dst_label_dir, aug_index):
+def plan_class(cls_rel_path, images):
     """
-    Augment edilmiş resmi JPG kaydeder ve label'ı kopyalar.
+    Bir sınıfın val/test/train bölmesini yapar ve pipeline işlerini döndürür.
+    Augment sayısı önceden hesaplanır: hedef, train klasöründe zaten bulunanlar
+    ile bu çalıştırmada kopyalanacakların birleşimine göre belirlenir.
     """
-    img = cv2.imread(src_img)
-    if img is None:
-        print(f"   ⚠️  Augment için okunamadı: {src_img}")
-        return False
-    augmented = transform(image=img)['image']
-    base_name = os.path.splitext(os.path.basename(src_img))[0]
-    new_name = f"{base_name}_aug{aug_index}"
-    dst_img_path = os.path.join(dst_img_dir, new_name + ".jpg")
-    cv2.imwrite(dst_img_path, augmented)
-    if os.path.exists(src_label):
-        shutil.copy(src_label, os.path.join(dst_label_dir, new_name + ".txt"))
-    else:
-        print(f"   ⚠️  Augmented için label yok: {src_label}")
-    return True
-
-# --- İŞLEM ---
-# 1. Dinamik olarak alt klasörleri bul (images/labels yapısını kontrol ederek)
-all_classes = []
-for root, dirs, files in os.walk(source_dir):
-    for d in dirs:
-        dir_path = os.path.join(root, d)
-        images_folder = os.path.join(dir_path, "images")
-        labels_folder = os.path.join(dir_path, "labels")
-        if os.path.isdir(images_folder):
-            # jpg, JPG, png, jpeg, etc.
-            jpgs = glob(os.path.join(images_folder, "*.jpg")) + glob(os.path.join(images_folder, "*.JPG")) \
-                   + glob(os.path.join(images_folder, "*.png")) + glob(os.path.join(images_folder, "*.PNG")) \
-                   + glob(os.path.join(images_folder, "*.jpeg")) + glob(os.path.join(images_folder, "*.JPEG"))
-            if jpgs:
-                rel = os.path.relpath(dir_path, source_dir)
-                if rel not in all_classes:
-                    all_classes.append(rel)
-
-if not all_classes:
-    print("⚠️  Hiç sınıf bulunamadı. source_dir ve alt yapıyı kontrol et.")
-else:
-    print(f"🔎 Toplam sınıf bulundu: {len(all_classes)}")
-
-make_dirs(output_dir, all_classes)
-
-# 2. Her alt klasör için işlemleri uygula
-for cls_rel_path in all_classes:
-    cls_full_path = os.path.join(source_dir, cls_rel_path)
-    images_folder = os.path.join(cls_full_path, "images")
-    labels_folder = os.path.join(cls_full_path, "labels")
-
-    # tüm görüntüleri al (jpg, png, jpeg, büyük/küçük)
-    raw_images = []
-    raw_images += glob(os.path.join(images_folder, "*.jpg"))
-    raw_images += glob(os.path.join(images_folder, "*.JPG"))
-    raw_images += glob(os.path.join(images_folder, "*.png"))
-    raw_images += glob(os.path.join(images_folder, "*.PNG"))
-    raw_images += glob(os.path.join(images_folder, "*.jpeg"))
-    raw_images += glob(os.path.join(images_folder, "*.JPEG"))
-
-    # normalize et ve sırayı koruyarak duplicateları kaldır
-    # Windows'ta path'ler case-insensitive olabilir, bu yüzden lower() ile normalize edip dict.fromkeys ile dedupe yapıyoruz
-    seen = {}
-    images = []
-    for p in raw_images:
-        key = os.path.normpath(p).lower()   # normalize & lower ile güvenli karşılaştırma
-        if key not in seen:
-            seen[key] = True
-            images.append(p)
-
-    images = sorted(images)  # istersen alfabetik sıraya sok (opsiyonel)
+    labels_folder = os.path.join(source_dir, cls_rel_path, "labels")
 
     # debug: ilk birkaç dosyayı göster
     print(f"\n📁 İşlenen Sınıf: {cls_rel_path}")
@@ -178,71 +97,294 @@ for cls_rel_path in all_classes:
 
     combined = list(zip(images, labels))
     random.shuffle(combined)
-    images, labels = zip(*combined) if combined else ([], [])
-
-    # Val ve Test
-    val_images = images[:val_split]
-    val_labels = labels[:val_split]
-
-    test_images = images[val_split:val_split+test_split]
-    test_labels = labels[val_split:val_split+test_split]
-
-    train_images = images[val_split+test_split:]
-    train_labels = labels[val_split+test_split:]
-
-    print(f"   Val: {len(val_images)}  Test: {len(test_images)}  Orijinal Train: {len(train_images)}")
-
-    # Kopyala (val/test/train) - eksik label'larda uyar, atla
-    for img, lbl in zip(val_images, val_labels):
-        ok = copy_image_and_label(img, lbl,
-                             os.path.join(output_dir, "val", cls_rel_path, "images"),
-                             os.path.join(output_dir, "val", cls_rel_path, "labels"),
-                             os.path.splitext(os.path.basename(img))[0])
-        if not ok:
-            print(f"   ⚠️  Val kopyalama atlandı: {img}")
-
-    for img, lbl in zip(test_images, test_labels):
-        ok = copy_image_and_label(img, lbl,
-                             os.path.join(output_dir, "test", cls_rel_path, "images"),
-                             os.path.join(output_dir, "test", cls_rel_path, "labels"),
-                             os.path.splitext(os.path.basename(img))[0])
-        if not ok:
-            print(f"   ⚠️  Test kopyalama atlandı: {img}")
-
-    for img, lbl in zip(train_images, train_labels):
-        ok = copy_image_and_label(img, lbl,
-                             os.path.join(output_dir, "train", cls_rel_path, "images"),
-                             os.path.join(output_dir, "train", cls_rel_path, "labels"),
-                             os.path.splitext(os.path.basename(img))[0])
-        if not ok:
-            print(f"   ⚠️  Train kopyalama atlandı: {img}")
+
+    splits = {
+        "val": combined[:val_split],
+        "test": combined[val_split:val_split+test_split],
+        "train": combined[val_split+test_split:],
+    }
+    print(f"   Val: {len(splits['val'])}  Test: {len(splits['test'])}  Orijinal Train: {len(splits['train'])}")
+
+    jobs = []
+    for split, pairs in splits.items():
+        dst_img_dir = os.path.join(output_dir, split, cls_rel_path, "images")
+        dst_label_dir = os.path.join(output_dir, split, cls_rel_path, "labels")
+        for img, lbl in pairs:
+            new_name = os.path.splitext(os.path.basename(img))[0]
+            jobs.append({"kind": "copy", "split": split, "cls": cls_rel_path, "src_img": img, "src_label": lbl,
+                         "dst_img": os.path.join(dst_img_dir, new_name + ".jpg"),
+                         "dst_label": os.path.join(dst_label_dir, new_name + ".txt")})
 
     # --- Eksikse augmentasyon ---
-    train_count = len(os.listdir(os.path.join(output_dir, "train", cls_rel_path, "images")))
-    aug_index = 0
+    train_pairs = splits["train"]
+    train_img_dir = os.path.join(output_dir, "train", cls_rel_path, "images")
+    train_label_dir = os.path.join(output_dir, "train", cls_rel_path, "labels")
+    train_names = set(os.listdir(train_img_dir))
+    train_names.update(os.path.splitext(os.path.basename(img))[0] + ".jpg" for img, _ in train_pairs)
+    n_aug = min(max(0, train_split - len(train_names)), max_aug_iterations)
 
     # güvenlik: eğer orijinal train_images hiç yoksa augmentasyon yapmayı atla
-    if len(train_images) == 0:
+    if not train_pairs:
         print(f"   ⚠️  Uyarı: {cls_rel_path} için hiç orijinal train görüntüsü yok — augmentasyon atlandı.")
+        n_aug = 0
+    # İsimlendirme train görselleri üzerinde sırayla döner (aug_index). Bir
+    # orijinalin kopyaları aug_chunk_size'lık işler halinde gruplanır; işler
+    # ortak havuzdaki işçilere dağılır ve kaynak işçinin decode önbelleğinden
+    # karşılanır.
+    for j, (img, lbl) in enumerate(train_pairs[:n_aug]):
+        aug_indices = list(range(j, n_aug, len(train_pairs)))
+        for start in range(0, len(aug_indices), aug_chunk_size):
+            copies = []
+            for aug_index in aug_indices[start:start + aug_chunk_size]:
+                new_name = f"{os.path.splitext(os.path.basename(img))[0]}_aug{aug_index}"
+                copies.append((os.path.join(train_img_dir, new_name + ".jpg"),
+                               os.path.join(train_label_dir, new_name + ".txt")))
+            jobs.append({"kind": "aug", "split": "train", "cls": cls_rel_path, "src_img": img, "src_label": lbl,
+                         "copies": copies})
+    return jobs
+
+class DecodeCache:
+    """
+    Çözülmüş kaynak görseller için bayt bütçeli LRU önbellek.
+    Bütçe aşılınca en uzun süredir kullanılmayan kayıt çıkarılır.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, load):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        value = load()
+        size = value.nbytes if value is not None else 0
+        if size <= self.max_bytes:
+            while self.nbytes + size > self.max_bytes:
+                _, old = self.entries.popitem(last=False)
+                self.nbytes -= old.nbytes if old is not None else 0
+                self.evictions += 1
+            self.entries[key] = value
+            self.nbytes += size
+        return value
+
+    def stats(self):
+        return self.hits, self.misses, self.evictions
+
+
+_decode_cache = None
+
+def _init_worker(cache_bytes):
+    global _decode_cache
+    cv2.setNumThreads(1)  # paralellik süreç havuzundan gelir
+    _decode_cache = DecodeCache(cache_bytes)
+
+def encode_image(data):
+    """Süreç havuzunda çalışır: JPEG olmayan kaynağın baytlarını çözüp JPG olarak kodlar (olmazsa None)."""
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    return buf.tobytes() if ok else None
+
+def augment_source(src_img, n_copies):
+    """
+    Süreç havuzunda çalışır: kaynağı işçinin decode önbelleğinden alır (yoksa
+    diskten okuyup önbelleğe koyar) ve n_copies augment kopyası üretir.
+    (jpg baytları listesi veya görsel okunamazsa None, önbellek sayaçlarındaki
+    (isabet, kaçırma, tahliye) artışı) döndürür. Transform yalnızca
+    fotometriktir; kutular yer değiştirmez, label'lar yazma aşamasında olduğu
+    gibi kopyalanır.
+    """
+    before = _decode_cache.stats()
+    img = _decode_cache.get(src_img, lambda: cv2.imread(src_img))
+    delta = tuple(a - b for a, b in zip(_decode_cache.stats(), before))
+    if img is None:
+        return None, delta
+    outputs = []
+    for _ in range(n_copies):
+        augmented = transform(image=img)["image"]
+        ok, buf = cv2.imencode(".jpg", augmented, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        outputs.append(buf.tobytes() if ok else None)
+    return outputs, delta
+
+def read_stage(job):
+    if job["kind"] == "aug":
+        job["data"] = None  # augment kaynağı işçide (önbellek üzerinden) okunur
+        return job
+    job["link"] = is_jpeg(job["src_img"])
+    if job["link"]:
+        job["data"] = None  # zaten JPEG: yeniden kodlanmaz, yazma aşamasında linklenir/kopyalanır
+        return job
+    with open(job["src_img"], "rb") as f:
+        job["data"] = f.read()
+    return job
+
+def write_stage(job, mode):
+    """
+    Görseli ve label'ı yazar; her yazılan görsel için kullanılan yöntemin
+    listesini döndürür. Label'lar her zaman kopyalanır.
+    """
+    if job["kind"] == "aug":
+        methods = []
+        has_label = os.path.exists(job["src_label"])
+        for (dst_img, dst_label), data in zip(job["copies"], job["outputs"]):
+            if data is None:
+                continue
+            with open(dst_img, "wb") as f:
+                f.write(data)
+            methods.append("augment")
+            if has_label:
+                shutil.copy(job["src_label"], dst_label)
+        if not has_label:
+            print(f"   ⚠️  Augmented için label yok: {job['src_label']}")
+        return methods
+    if job.get("link"):
+        method = materialize(job["src_img"], job["dst_img"], mode)
+    else:
+        with open(job["dst_img"], "wb") as f:
+            f.write(job["data"])
+        method = "reencode"
+    if os.path.exists(job["src_label"]):
+        shutil.copy(job["src_label"], job["dst_label"])
     else:
-        # Augment için döngü (mevcut train görsellerinin üzerinden döner)
-        # güvenlik: tek döngüde en fazla X augment olsun (ör: sınıf başına 5000), böylece takılmaz
-        max_aug_iterations = 5000
-        while train_count < train_split and aug_index < max_aug_iterations:
-            for img, lbl in zip(train_images, train_labels):
-                success = augment_and_save(img, lbl,
-                                 os.path.join(output_dir, "train", cls_rel_path, "images"),
-                                 os.path.join(output_dir, "train", cls_rel_path, "labels"),
-                                 aug_index)
-                if success:
-                    aug_index += 1
-                    train_count += 1
-                if train_count >= train_split or aug_index >= max_aug_iterations:
-                    break
-
-    if aug_index > 0:
-        print(f"   🔄 Augmentasyon ile {aug_index} görsel eklendi (hedef: {train_split})")
+        print(f"   ⚠️  Etiket bulunamadı: {job['src_label']} (görsel kopyalandı ama etiketsiz)")
+    return [method]
+
+def start_stage(fn, in_q, out_q, n_threads, on_error):
+    """
+    in_q'dan iş alıp fn ile işleyen n_threads iş parçacığı başlatır; sonuç
+    (None değilse) out_q'ya konur. in_q'daki her None bir iş parçacığını durdurur.
+    """
+    def loop():
+        while True:
+            job = in_q.get()
+            if job is None:
+                break
+            try:
+                result = fn(job)
+            except Exception as e:
+                on_error(job, e)
+                continue
+            if result is not None and out_q is not None:
+                out_q.put(result)
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    return threads
+
+def run_pipeline(class_images, mode=materialize_mode):
+    """
+    Üç aşamalı pipeline: okuma (iş parçacıkları) -> çözme/augment/kodlama
+    (süreç havuzu) -> yazma (iş parçacıkları). Aşamalar sınırlı kuyruklarla
+    bağlıdır; bir sınıfın kopyalanması başka bir sınıfın augmentasyonuyla
+    çakışır. Bellekte en fazla ~3 * queue_size iş bekler; kopyalama işi tek
+    görsel, augment işi en fazla aug_chunk_size kodlanmış görsel taşır.
+
+    Tüm işçiler tek bir ortak süreç havuzundadır. Augment işleri kaynak
+    başına gruplanmış (en fazla aug_chunk_size kopya) görevlerdir ve boştaki
+    işçilere dağılır. Her işçi çözülmüş kaynakları bayt bütçeli bir LRU'da
+    (decode_cache_mb işçilere bölünür) tutar; aynı kaynağın sonraki
+    görevleri o işçide yeniden çözülmez. Önbellek sayaçları sonda yazdırılır.
+    """
+    results = {cls: {"copy": 0, "aug": 0} for cls in class_images}
+    methods = {}
+    cache_stats = [0, 0, 0]  # isabet, kaçırma, tahliye
+    lock = threading.Lock()
+
+    def on_error(job, e):
+        print(f"   ⚠️  {job['split'].capitalize()} işlemi atlandı: {job['src_img']} | {e}")
+
+    def encode_stage(job):
+        if job.get("link"):
+            return job
+        if job["kind"] == "aug":
+            job["outputs"], delta = pool.submit(augment_source, job["src_img"], len(job["copies"])).result()
+            with lock:
+                for i, d in enumerate(delta):
+                    cache_stats[i] += d
+            if job["outputs"] is None:
+                print(f"   ⚠️  Augment için okunamadı: {job['src_img']}")
+                return None
+            return job
+        job["data"] = pool.submit(encode_image, job["data"]).result()
+        if job["data"] is None:
+            print(f"   ⚠️  Görsel okunamadı: {job['src_img']}")
+            return None
+        return job
+
+    def count_stage(job):
+        written = write_stage(job, mode)
+        with lock:
+            results[job["cls"]][job["kind"]] += len(written)
+            for method in written:
+                methods[method] = methods.get(method, 0) + 1
+
+    job_q = queue.Queue(maxsize=queue_size)
+    read_q = queue.Queue(maxsize=queue_size)
+    write_q = queue.Queue(maxsize=queue_size)
+
+    cache_bytes = decode_cache_mb * 1024 * 1024 // num_workers
+    pool = ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(cache_bytes,))
+    try:
+        readers = start_stage(read_stage, job_q, read_q, io_threads, on_error)
+        encoders = start_stage(encode_stage, read_q, write_q, num_workers, on_error)
+        writers = start_stage(count_stage, write_q, None, io_threads, on_error)
+
+        for cls_rel_path, images in class_images.items():
+            for job in plan_class(cls_rel_path, images):
+                job_q.put(job)
+
+        # Her aşama bitince bir sonrakine durdurma sinyali gönder
+        for stage_threads, q in ((readers, job_q), (encoders, read_q), (writers, write_q)):
+            for _ in stage_threads:
+                q.put(None)
+            for t in stage_threads:
+                t.join()
+    finally:
+        pool.shutdown()
+    hits, misses, evictions = cache_stats
+    print(f"\n🧠 Decode önbelleği: {hits} isabet, {misses} kaçırma, {evictions} tahliye")
+    print("🔗 Görsel yazma yöntemleri: " + ", ".join(f"{k}: {v}" for k, v in sorted(methods.items())))
+    return results
+
+# --- İŞLEM ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sınıf klasörlerinden dengelenmiş ve augment edilmiş train/val/test veri seti oluşturur.")
+    add_materialize_argument(parser, default=materialize_mode)
+    args = parser.parse_args()
+
+    # 1. Dinamik olarak alt klasörleri bul (images/labels yapısını kontrol ederek)
+    class_images = {}
+    for root, dirs, files in os.walk(source_dir):
+        for d in dirs:
+            dir_path = os.path.join(root, d)
+            images_folder = os.path.join(dir_path, "images")
+            if os.path.isdir(images_folder):
+                images = list_images(images_folder)
+                if images:
+                    rel = os.path.relpath(dir_path, source_dir)
+                    class_images.setdefault(rel, images)
+
+    if not class_images:
+        print("⚠️  Hiç sınıf bulunamadı. source_dir ve alt yapıyı kontrol et.")
     else:
-        print(f"   ✅ Augmentasyon uygulanmadı (yeterli orijinal varsa)")
+        print(f"🔎 Toplam sınıf bulundu: {len(class_images)}")
+
+    make_dirs(output_dir, list(class_images))
+
+    # 2. Tüm sınıfların işleri tek pipeline'dan geçer
+    results = run_pipeline(class_images, mode=args.materialize)
+
+    print()
+    for cls_rel_path, r in results.items():
+        if r["aug"] > 0:
+            print(f"   🔄 {cls_rel_path}: Augmentasyon ile {r['aug']} görsel eklendi (hedef: {train_split})")
+        else:
+            print(f"   ✅ {cls_rel_path}: Augmentasyon uygulanmadı (yeterli orijinal varsa)")
 
-print("\n✅ Dataset başarıyla organize edildi ve augmentasyon uygulandı!")
+    print("\n✅ Dataset başarıyla organize edildi ve augmentasyon uygulandı!")
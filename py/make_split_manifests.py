@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import time
+import argparse
+import numpy as np
+from dataset_index import DatasetIndex
+from label_stats import load_label_table
+
+SPLITS = ("train", "val", "test")
+_PLAIN_YAML = re.compile(r"[A-Za-z_][A-Za-z0-9_.\-]*")
+_YAML_KEYWORDS = {"true", "false", "yes", "no", "on", "off", "null", "y", "n"}
+
+
+def image_strata(pairs, table, root_dir):
+    """
+    Her görsel için tabakalama (stratify) anahtarını döndürür: görseldeki en
+    nadir sınıf (o sınıfı içeren görsel sayısına göre). Kutusu olmayan
+    görseller ve label'ı hiç olmayanlar (label yolu None) -1 (arka plan)
+    tabakasına düşer.
+    """
+    n_files = len(table.files)
+    strata_per_file = np.full(n_files, -1, dtype=np.int64)
+    if len(table):
+        # (dosya, sınıf) çiftleri tekil hale getirilir: bir görsel bir sınıfı bir kez sayar
+        file_cls = np.unique(np.stack([table.file_idx.astype(np.int64), table.classes.astype(np.int64)], axis=1), axis=0)
+        ids, image_counts = np.unique(file_cls[:, 1], return_counts=True)
+        rarity = image_counts[np.searchsorted(ids, file_cls[:, 1])]
+        # dosyaya, sonra nadirliğe göre sırala; her dosyanın ilk satırı en nadir sınıfıdır
+        order = np.lexsort((file_cls[:, 1], rarity, file_cls[:, 0]))
+        file_cls = file_cls[order]
+        first = np.ones(len(file_cls), dtype=bool)
+        first[1:] = file_cls[1:, 0] != file_cls[:-1, 0]
+        strata_per_file[file_cls[first, 0]] = file_cls[first, 1]
+
+    file_pos = {os.path.normcase(f): i for i, f in enumerate(table.files)}
+    prefix = len(os.path.join(root_dir, ""))  # indeks yolları normpath(root_dir + göreli yol) biçimindedir
+    strata = np.full(len(pairs), -1, dtype=np.int64)
+    for i, (_, _, label_path) in enumerate(pairs):
+        if label_path is None:
+            continue
+        pos = file_pos.get(os.path.normcase(label_path[prefix:]))
+        if pos is not None:
+            strata[i] = strata_per_file[pos]
+    return strata
+
+
+def stratified_split(strata, val_ratio, test_ratio, seed=0):
+    """
+    Her tabakayı seed ile karıştırıp oranlara göre böler.
+    Her görsel için split indexini (0=train, 1=val, 2=test) döndürür.
+    """
+    rng = np.random.default_rng(seed)
+    assignment = np.zeros(len(strata), dtype=np.int8)
+    order = np.argsort(strata, kind="stable")
+    bounds = np.flatnonzero(np.diff(strata[order])) + 1
+    for group in np.split(order, bounds):
+        if not len(group):
+            continue
+        group = rng.permutation(group)
+        n_val = int(round(len(group) * val_ratio))
+        n_test = int(round(len(group) * test_ratio))
+        assignment[group[:n_val]] = 1
+        assignment[group[n_val:n_val + n_test]] = 2
+    return assignment
+
+
+def _write_lines(path, lines):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + ("\n" if lines else ""))
+    os.replace(tmp, path)
+
+
+def yaml_scalar(text):
+    """
+    Metni YAML skaleri olarak döndürür: sade isimler olduğu gibi, ':' '#'
+    gibi özel karakter içeren ya da true/null gibi okunabilecek olanlar
+    çift tırnaklı (JSON kaçışlı; geçerli YAML) yazılır.
+    """
+    text = str(text)
+    if _PLAIN_YAML.fullmatch(text) and text.lower() not in _YAML_KEYWORDS:
+        return text
+    return json.dumps(text, ensure_ascii=False)
+
+
+def write_data_yaml(path, out_dir, split_files, names):
+    """Ultralytics data YAML'ını (path/train/val/test/names) yazar; PyYAML gerekmez."""
+    lines = [f"path: {yaml_scalar(os.path.abspath(out_dir))}"]
+    for split in SPLITS:
+        if split in split_files:
+            lines.append(f"{split}: {yaml_scalar(os.path.basename(split_files[split]))}")
+    lines.append("names:")
+    lines.extend(f"  {i}: {yaml_scalar(name)}" for i, name in enumerate(names))
+    _write_lines(path, lines)
+
+
+def write_split_manifests(root_dir, out_dir=None, val_ratio=0.2, test_ratio=0.0, seed=0,
+                          class_names=None, index_path=None, skip_background=False):
+    """
+    Veri setini kopyalamadan böler: train.txt / val.txt (/ test.txt) görsel
+    listeleri ve data.yaml yazar. Eşleştirme kalıcı SQLite indeksinden
+    (dataset_index.py), sınıflar önbellekli label tablosundan (label_stats.py)
+    okunur; böylece yeni oran veya seed ile yeniden bölmek yalnızca
+    değişen dosyaları tarar ve hiç görsel baytı yazmaz.
+
+    Label dosyası olmayan görseller (arka plan) de -1 tabakasında bölünür;
+    skip_background=True ise manifestlere hiç girmez.
+
+    Returns:
+        {split: görsel sayısı}
+    """
+    start = time.perf_counter()
+    root_dir = os.path.abspath(root_dir)
+    out_dir = out_dir or os.path.join(root_dir, "splits")
+    os.makedirs(out_dir, exist_ok=True)
+
+    with DatasetIndex(root_dir, index_path) as index:
+        index.refresh()
+        pairs = index.pairs()
+        background = [(class_folder, image_path, None) for class_folder, image_path in index.unlabeled_images()]
+    table = load_label_table(root_dir)
+    print(f"🔎 {len(pairs)} görsel-label çifti, {len(background)} label'sız görsel, {len(table)} kutu bulundu.")
+    if skip_background:
+        print(f"   ⏭️  {len(background)} label'sız görsel manifestlere alınmadı (--skip-background).")
+    else:
+        pairs += background
+
+    strata = image_strata(pairs, table, root_dir)
+    assignment = stratified_split(strata, val_ratio, test_ratio, seed)
+
+    split_files, counts = {}, {}
+    for split_idx, split in enumerate(SPLITS):
+        if split == "test" and test_ratio <= 0:
+            stale = os.path.join(out_dir, "test.txt")
+            if os.path.exists(stale):
+                os.remove(stale)  # önceki bölmeden kalan test listesi data.yaml ile çelişmesin
+            continue
+        paths = [pairs[i][1] for i in np.flatnonzero(assignment == split_idx)]
+        split_files[split] = os.path.join(out_dir, f"{split}.txt")
+        _write_lines(split_files[split], paths)
+        counts[split] = len(paths)
+
+    n_classes = max(len(class_names or []), int(table.classes.max()) + 1 if len(table) else 0)
+    names = [class_names[i] if class_names and i < len(class_names) else f"class_{i}" for i in range(n_classes)]
+    write_data_yaml(os.path.join(out_dir, "data.yaml"), out_dir, split_files, names)
+
+    for split, n in counts.items():
+        print(f"   📄 {split}: {n} görsel -> {split_files[split]}")
+    print(f"✅ Manifestler yazıldı: {os.path.join(out_dir, 'data.yaml')} ({time.perf_counter() - start:.2f} sn)")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Görselleri kopyalamadan train/val/test manifestleri (txt + data.yaml) oluşturur.")
+    parser.add_argument("--path", type=str, default=".", help="Veri setinin ana klasörü (sınıf/images + sınıf/labels)")
+    parser.add_argument("--out", type=str, default=None, help="Manifest klasörü (varsayılan: <path>/splits)")
+    parser.add_argument("--val", type=float, default=0.2, help="Val oranı")
+    parser.add_argument("--test", type=float, default=0.0, help="Test oranı")
+    parser.add_argument("--seed", type=int, default=0, help="Karıştırma seed'i")
+    parser.add_argument("--names", type=str, default=None, help="Sınıf isimleri (satır başına bir isim, classes.txt)")
+    parser.add_argument("--index", type=str, default=None, help="SQLite indeks yolu (varsayılan: <path>/.dataset_index.sqlite)")
+    parser.add_argument("--skip-background", action="store_true",
+                        help="Label dosyası olmayan görselleri manifestlere alma (varsayılan: arka plan olarak bölünür)")
+    args = parser.parse_args()
+
+    names = None
+    if args.names:
+        with open(args.names, "r", encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+    write_split_manifests(args.path, args.out, val_ratio=args.val, test_ratio=args.test, seed=args.seed,
+                          class_names=names, index_path=args.index, skip_background=args.skip_background)
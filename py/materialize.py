@@ -0,0 +1,131 @@
+import os
+import sys
+import shutil
+from functools import lru_cache
+import cv2
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+FICLONE = 0x40049409  # Linux ioctl: dosyayı copy-on-write klonla (btrfs, xfs, ...)
+
+# auto: reflink -> hardlink -> copy
+MODES = ("auto", "copy", "hardlink", "reflink", "symlink")
+
+
+def is_jpeg(path):
+    """Uzantıya değil dosyanın ilk baytlarına (magic) bakarak JPEG olup olmadığını söyler."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(3) == JPEG_MAGIC
+    except OSError:
+        return False
+
+
+def _reflink(src, dst):
+    """Copy-on-write klon dener; desteklenmiyorsa OSError fırlatır."""
+    if not sys.platform.startswith("linux"):
+        raise OSError("reflink bu platformda desteklenmiyor")
+    import fcntl
+    with open(src, "rb") as fs, open(dst, "wb") as fd:
+        try:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+        except OSError:
+            fd.close()
+            os.remove(dst)
+            raise
+
+
+# reflink denemesi başarısız olan aygıtlar: tekrar denenmez, doğrudan hardlink/kopyaya geçilir
+_no_reflink_devices = set()
+
+
+@lru_cache(maxsize=None)
+def _device(dir_path):
+    try:
+        return os.stat(dir_path).st_dev
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _same_device(src_dir, dst_dir):
+    """Hardlink/reflink yalnızca aynı aygıt (disk/bölüm) içinde mümkündür."""
+    try:
+        return os.stat(src_dir).st_dev == os.stat(dst_dir).st_dev
+    except OSError:
+        return False
+
+
+def materialize(src, dst, mode="auto"):
+    """
+    src dosyasını dst'ye verilen yöntemle yerleştirir ve gerçekte kullanılan
+    yöntemi ("reflink", "hardlink", "symlink", "copy") döndürür.
+
+    mode:
+        auto     : reflink, olmazsa hardlink, olmazsa kopya
+        reflink  : copy-on-write klon (btrfs/xfs/APFS benzeri), olmazsa kopya
+        hardlink : aynı dosyaya ikinci isim, olmazsa kopya
+        symlink  : kaynağa mutlak yollu sembolik link, olmazsa kopya
+        copy     : normal kopya
+
+    Kaynak ve hedef farklı aygıtlardaysa reflink/hardlink denenmeden kopyalanır.
+    reflink bir aygıtta bir kez başarısız olursa o aygıtta bir daha denenmez.
+    Not: hardlink ve symlink kaynakla aynı veriyi gösterir; çıktı görseli
+    yerinde düzenlenirse kaynak da değişir (label'lar bu yüzden her zaman
+    kopyalanır).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Bilinmeyen materialize modu: {mode} (seçenekler: {', '.join(MODES)})")
+    if os.path.lexists(dst):
+        os.remove(dst)  # önceki çalıştırmadan kalan link/kopya
+
+    if mode == "symlink":
+        try:
+            os.symlink(os.path.abspath(src), dst)
+            return "symlink"
+        except OSError:  # ör. Windows'ta geliştirici modu/yetki yoksa
+            pass
+    elif mode != "copy" and _same_device(os.path.dirname(os.path.abspath(src)),
+                                          os.path.dirname(os.path.abspath(dst))):
+        device = _device(os.path.dirname(os.path.abspath(dst)))
+        if mode in ("auto", "reflink") and device not in _no_reflink_devices:
+            try:
+                _reflink(src, dst)
+                return "reflink"
+            except OSError:
+                _no_reflink_devices.add(device)
+        if mode in ("auto", "hardlink"):
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError:
+                pass
+
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def add_materialize_argument(parser, default="copy"):
+    """Araçlar arasında ortak --materialize seçeneğini argparse'a ekler."""
+    parser.add_argument("--materialize", choices=MODES, default=default,
+                        help="Görsellerin çıktıya nasıl yerleştirileceği "
+                             "(auto = reflink > hardlink > copy; farklı diskte otomatik copy)")
+
+
+def reencode_to_jpg(src, dst, quality=95):
+    """JPEG olmayan bir görseli çözüp verilen kalitede JPG olarak yazar. Başarılıysa True."""
+    img = cv2.imread(src)
+    if img is None:
+        return False
+    return cv2.imwrite(dst, img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+
+def convert_to_jpg(src, dst, quality=95, mode="auto"):
+    """
+    Görseli dst'ye JPG olarak yerleştirir. Zaten JPEG olan dosyalar (uzantısı
+    .jpeg/.JPG vb. olsa da) yeniden kodlanmaz, materialize ile yerleştirilir;
+    yalnızca gerçekten JPEG olmayanlar yeniden kodlanır.
+    Kullanılan yöntemi ya da okunamadıysa None döndürür.
+    """
+    if is_jpeg(src):
+        return materialize(src, dst, mode)
+    return "reencode" if reencode_to_jpg(src, dst, quality) else None
@@ -1,36 +1,92 @@
-import os, shutil, cv2, uuid
+import os, shutil, json, hashlib, argparse
 from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from materialize import is_jpeg, materialize, reencode_to_jpg, add_materialize_argument
 
 base_dir = r"C:\Users\524ha\Desktop\AYGAZ_DATAS\Datasets\Ev1\DatasetSplitted"
 merged_dir = r"C:\Users\524ha\Desktop\AYGAZ_DATAS\Datasets\Ev1\DatasetMerged"
 splits = ["train", "val", "test"]
+num_workers = os.cpu_count() or 4  # JPEG olmayan görselleri yeniden kodlayacak süreç sayısı
+jpeg_quality = 95
+materialize_mode = "auto"  # JPEG görsellerin yerleştirilmesi (--materialize ile değiştirilebilir)
+manifest_name = ".merge_manifest.json"  # merged_dir içinde; önceki birleştirmelerin kaydı
 
 def make_dirs(path):
     for split in splits:
         os.makedirs(os.path.join(path, split, "images"), exist_ok=True)
         os.makedirs(os.path.join(path, split, "labels"), exist_ok=True)
 
-def convert_to_jpg_and_copy(src_img, dst_img_path):
-    ext = os.path.splitext(src_img)[1].lower()
-    if ext in [".png", ".jpeg", ".tif", ".tiff", ".bmp"]:
-        img = cv2.imread(src_img)
-        if img is None:
-            return False
-        cv2.imwrite(dst_img_path, img)
-    else:
-        shutil.copy(src_img, dst_img_path)
-    return True
-
-def merge_split(split):
+def load_manifest(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            print(f"⚠️  Manifest okunamadı, tam birleştirme yapılacak: {path}")
+    return {}
+
+def save_manifest(path, manifest):
+    # Atomik yaz: yarıda kalan çalıştırma bozuk manifest bırakmasın
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+    except FileNotFoundError:
+        return None
+
+def _remove_outputs(split_dst_img, split_dst_lbl, name):
+    for path in (os.path.join(split_dst_img, name + ".jpg"), os.path.join(split_dst_lbl, name + ".txt")):
+        if os.path.lexists(path):
+            os.remove(path)
+
+def merge_split(split, pool, manifest, mode=materialize_mode):
+    """
+    Artımlı birleştirme. Çıktı isimleri deterministiktir: göreli yol öneki +
+    dosya adı + uzantı + içerik hash'i (aynı içerikli a.jpg ve a.png ayrı
+    çıktılar alır). manifest[split] her kaynak görsel için
+    görsel ve label boyut/mtime bilgisini ve çıktı adını tutar; yeniden
+    çalıştırmada yalnızca yeni/değişen görseller ve label'lar yazılır,
+    kaynağı silinen çıktılar kaldırılır.
+
+    Zaten JPEG olan görseller (magic baytlarına göre) yeniden kodlanmadan
+    mode'a göre linklenir/kopyalanır (label'lar her zaman kopyalanır);
+    yalnızca gerçekten JPEG olmayanlar süreç havuzunda JPG'ye çevrilir.
+    """
     print(f"\n🔄 {split.upper()} verileri birleştiriliyor...")
     split_src = os.path.join(base_dir, split)
     split_dst_img = os.path.join(merged_dir, split, "images")
     split_dst_lbl = os.path.join(merged_dir, split, "labels")
+    old_entries = manifest.get(split, {})
+    entries = {}
+    claimed = set()  # bu çalıştırmada bir kaynağa verilmiş çıktı isimleri
 
     # sadece en alt "images" klasörlerini bul
     all_image_files = glob(os.path.join(split_src, "**", "images", "*.*"), recursive=True)
     seen = set()
-    count, missing_label = 0, 0
+    count, missing_label, skipped = 0, 0, 0
+    methods = {}
+    reencode_jobs = []
+
+    def place_label(src_lbl, dst_lbl_path, entry):
+        nonlocal missing_label
+        if entry["label"] is not None:
+            shutil.copy(src_lbl, dst_lbl_path)
+        else:
+            missing_label += 1
+            if os.path.exists(dst_lbl_path):
+                os.remove(dst_lbl_path)  # kaynağın label'ı silinmiş
 
     for src_img in all_image_files:
         ext = os.path.splitext(src_img)[1].lower()
@@ -46,29 +102,75 @@ def merge_split(split):
         base = os.path.splitext(os.path.basename(src_img))[0]
         src_lbl = os.path.join(labels_dir, base + ".txt")
 
-        # benzersiz isim oluştur
-        rel_prefix = os.path.relpath(os.path.dirname(os.path.dirname(src_img)), split_src).replace(os.sep, "_")
-        unique_id = uuid.uuid4().hex[:6]
-        new_basename = f"{rel_prefix}_{base}_{unique_id}"
+        rel = os.path.relpath(src_img, split_src).replace(os.sep, "/")
+        img_key, lbl_key = _stat_key(src_img), _stat_key(src_lbl)
+        old = old_entries.get(rel)
+
+        # Eski (uzantısız) isim düzeninde çakışan bir isim yeniden kullanılmaz
+        if old and old["image"] == img_key and old["name"] not in claimed:
+            entry = dict(old, label=lbl_key)
+            new_basename = old["name"]
+            image_done = os.path.exists(os.path.join(split_dst_img, new_basename + ".jpg"))
+        else:
+            # deterministik isim: göreli yol öneki + dosya adı + uzantı + içerik hash'i
+            rel_prefix = os.path.relpath(os.path.dirname(os.path.dirname(src_img)), split_src).replace(os.sep, "_")
+            new_basename = f"{rel_prefix}_{base}_{os.path.splitext(src_img)[1][1:]}_{file_hash(src_img)}"
+            entry = {"image": img_key, "label": lbl_key, "name": new_basename}
+            image_done = False
+        entries[rel] = entry
+        claimed.add(new_basename)
 
         dst_img_path = os.path.join(split_dst_img, new_basename + ".jpg")
         dst_lbl_path = os.path.join(split_dst_lbl, new_basename + ".txt")
 
-        ok = convert_to_jpg_and_copy(src_img, dst_img_path)
-        if not ok:
+        if image_done:
+            if not old or old.get("label") != lbl_key:
+                place_label(src_lbl, dst_lbl_path, entry)
+            skipped += 1
             continue
 
-        if os.path.exists(src_lbl):
-            shutil.copy(src_lbl, dst_lbl_path)
-        else:
-            missing_label += 1
+        if not is_jpeg(src_img):
+            reencode_jobs.append((pool.submit(reencode_to_jpg, src_img, dst_img_path, jpeg_quality),
+                                  rel, src_lbl, dst_lbl_path))
+            continue
+        method = materialize(src_img, dst_img_path, mode)
+        methods[method] = methods.get(method, 0) + 1
+        place_label(src_lbl, dst_lbl_path, entry)
+        count += 1
 
+    for future, rel, src_lbl, dst_lbl_path in reencode_jobs:
+        if not future.result():
+            del entries[rel]  # okunamadı; sonraki çalıştırmada tekrar denenir
+            continue
+        methods["reencode"] = methods.get("reencode", 0) + 1
+        place_label(src_lbl, dst_lbl_path, entries[rel])
         count += 1
 
-    print(f"✅ {split}: {count} görsel işlendi ({missing_label} label eksik)")
+    # Kaynağı artık olmayan ya da adı değişen çıktıları kaldır; başka bir
+    # kaynağın hâlâ kullandığı isim silinmez
+    removed = 0
+    live_names = {entry["name"] for entry in entries.values()}
+    for name in {entry["name"] for entry in old_entries.values()} - live_names:
+        _remove_outputs(split_dst_img, split_dst_lbl, name)
+        removed += 1
+    manifest[split] = entries
+
+    print(f"✅ {split}: {count} görsel işlendi, {skipped} değişmemiş atlandı, {removed} çıktı kaldırıldı "
+          f"({missing_label} label eksik)")
+    if methods:
+        print("   🔗 Yöntem: " + ", ".join(f"{k}: {v}" for k, v in sorted(methods.items())))
     print(f"   🔢 Sonuç: {len(os.listdir(split_dst_img))} images, {len(os.listdir(split_dst_lbl))} labels")
 
-make_dirs(merged_dir)
-for s in splits:
-    merge_split(s)
-print("\n🎯 Birleştirme tamamlandı!")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split klasörlerindeki sınıf klasörlerini tek bir veri setinde birleştirir.")
+    add_materialize_argument(parser, default=materialize_mode)
+    args = parser.parse_args()
+
+    make_dirs(merged_dir)
+    manifest_path = os.path.join(merged_dir, manifest_name)
+    manifest = load_manifest(manifest_path)
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        for s in splits:
+            merge_split(s, pool, manifest, mode=args.materialize)
+            save_manifest(manifest_path, manifest)
+    print("\n🎯 Birleştirme tamamlandı!")
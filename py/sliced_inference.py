@@ -0,0 +1,266 @@
+import os
+import time
+from functools import lru_cache
+import numpy as np
+from autolabel import iter_decoded, _to_numpy
+from autolabel_journal import atomic_write_text
+
+MERGE_METHODS = ("nms", "nmm", "wbf")
+MATCH_METRICS = ("iou", "ios")
+
+
+@lru_cache(maxsize=64)
+def slice_grid(image_height, image_width, slice_height, slice_width, overlap_height_ratio, overlap_width_ratio):
+    """
+    Görseli kaplayan dilimlerin (x1, y1, x2, y2) dizisi. Dilimleme SAHI'nin
+    get_slice_bboxes algoritmasıyla aynıdır (kenardaki dilimler görselin
+    içine kaydırılır). Aynı çözünürlük için bir kez hesaplanır.
+    """
+    slices = []
+    y_min = y_max = 0
+    y_overlap = int(overlap_height_ratio * slice_height)
+    x_overlap = int(overlap_width_ratio * slice_width)
+    while y_max < image_height:
+        x_min = x_max = 0
+        y_max = y_min + slice_height
+        while x_max < image_width:
+            x_max = x_min + slice_width
+            if y_max > image_height or x_max > image_width:
+                xmax, ymax = min(image_width, x_max), min(image_height, y_max)
+                slices.append((max(0, xmax - slice_width), max(0, ymax - slice_height), xmax, ymax))
+            else:
+                slices.append((x_min, y_min, x_max, y_max))
+            x_min = x_max - x_overlap
+        y_min = y_max - y_overlap
+    grid = np.asarray(slices, dtype=np.int64).reshape(-1, 4)
+    grid.flags.writeable = False  # önbellekteki dizi paylaşılır
+    return grid
+
+
+def box_overlaps(boxes, metric="iou"):
+    """(N, 4) xyxy kutular arası (N, N) IoU ya da IoS (kesişim / küçük kutunun alanı) matrisi."""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    area = (x2 - x1) * (y2 - y1)
+    inter_w = np.maximum(0, np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]))
+    inter_h = np.maximum(0, np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]))
+    inter = inter_w * inter_h
+    if metric == "ios":
+        denom = np.minimum(area[:, None], area[None, :])
+    else:
+        denom = area[:, None] + area[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, inter / denom, 0.0)
+
+
+def merge_detections(xyxy, scores, classes, method="nmm", metric="ios", threshold=0.5, class_agnostic=False):
+    """
+    Dilimlerden gelen örtüşen tespitleri birleştirir. Kutular skora göre
+    sıralanır; örtüşme matrisi tek seferde hesaplanır ve açgözlü döngü
+    yalnızca satır maskelerini birleştirir. Her tutulan kutu, henüz
+    kullanılmamış ve örtüşmesi threshold'dan büyük kutuları grubuna alır:
+
+        nms: grubun geri kalanı atılır
+        nmm: kutular birleşimi (union) kutuya genişletilir, skor en yüksek olan (SAHI GREEDYNMM)
+        wbf: koordinatlar skor ağırlıklı ortalanır, skor grubun ortalaması
+
+    Returns:
+        (xyxy, scores, classes) — skora göre azalan sırada
+    """
+    if method not in MERGE_METHODS:
+        raise ValueError(f"Bilinmeyen birleştirme yöntemi: {method} (seçenekler: {', '.join(MERGE_METHODS)})")
+    if metric not in MATCH_METRICS:
+        raise ValueError(f"Bilinmeyen eşleşme ölçütü: {metric} (seçenekler: {', '.join(MATCH_METRICS)})")
+    n = len(scores)
+    if n == 0:
+        return xyxy.reshape(0, 4), scores, classes
+    order = np.argsort(-scores, kind="stable")
+    xyxy, scores, classes = xyxy[order], scores[order], classes[order]
+
+    over = np.triu(box_overlaps(xyxy, metric) > threshold, k=1)
+    if not class_agnostic:
+        over &= classes[:, None] == classes[None, :]
+
+    used = np.zeros(n, dtype=bool)
+    keep, groups = [], []
+    for i in range(n):
+        if used[i]:
+            continue
+        members = np.flatnonzero(over[i] & ~used)
+        used[members] = True
+        keep.append(i)
+        groups.append(members)
+
+    keep = np.asarray(keep)
+    out_boxes = xyxy[keep].copy()
+    out_scores = scores[keep].copy()
+    if method != "nms":
+        for row, (i, members) in enumerate(zip(keep, groups)):
+            if not len(members):
+                continue
+            idx = np.concatenate([[i], members])
+            if method == "nmm":
+                out_boxes[row, :2] = xyxy[idx, :2].min(axis=0)
+                out_boxes[row, 2:] = xyxy[idx, 2:].max(axis=0)
+            else:
+                w = scores[idx]
+                out_boxes[row] = (xyxy[idx] * w[:, None]).sum(axis=0) / w.sum()
+                out_scores[row] = w.mean()
+    return out_boxes, out_scores, classes[keep]
+
+
+def yolo_label_text(xyxy, classes, img_width, img_height):
+    """Notebook'taki yolo_format ile aynı satırlar (normalize, yuvarlanmamış float)."""
+    lines = []
+    for (x1, y1, x2, y2), class_id in zip(np.asarray(xyxy, dtype=np.float64).tolist(),
+                                         np.asarray(classes).astype(int).tolist()):
+        x_center, y_center = (x1 + x2) / 2, (y1 + y2) / 2
+        w, h = x2 - x1, y2 - y1
+        lines.append(f"{class_id} {x_center / img_width} {y_center / img_height} {w / img_width} {h / img_height}\n")
+    return "".join(lines)
+
+
+class SlicedPredictor:
+    """
+    Dilimli (SAHI tarzı) çıkarım motoru.
+
+    - Dilim ızgarası her çözünürlük için bir kez hesaplanır (slice_grid).
+    - Birden çok görselin dilimleri (ve standard_pred=True ise tam görsel)
+      batch_size'lık gruplar halinde tek model.predict çağrısına verilir.
+    - Dilim sonuçları görsel koordinatlarına kaydırılır, görsel sınırına
+      kırpılır ve merge_detections ile vektörel olarak birleştirilir.
+
+    slice_size=None ise dilimleme yapılmaz; yalnızca tam görsel tahmini
+    (SAHI get_prediction ile aynı yol) kullanılır.
+
+    model, ultralytics YOLO gibi predict(source=[BGR dizi, ...], conf, iou,
+    device, verbose) çağrısına .boxes (xyxy, conf, cls) taşıyan sonuç
+    listesi döndüren herhangi bir nesne olabilir.
+    """
+
+    def __init__(self, model, slice_size=640, overlap=0.2, conf=0.2, iou=0.7, batch_size=16, standard_pred=True,
+                 merge="nmm", match_metric="ios", match_threshold=0.5, class_agnostic=False, device=None):
+        self.model = model
+        self.slice_size = slice_size
+        self.overlap = overlap
+        self.conf = conf
+        self.iou = iou
+        self.batch_size = batch_size
+        self.standard_pred = standard_pred
+        self.merge = merge
+        self.match_metric = match_metric
+        self.match_threshold = match_threshold
+        self.class_agnostic = class_agnostic
+        self.device = device
+        self.model_calls = 0
+
+    def settings(self):
+        """Günlük (AutolabelJournal) için sonuçları etkileyen ayarlar."""
+        return {"engine": "sliced_inference", "slice_size": self.slice_size, "overlap": self.overlap,
+                "conf": self.conf, "iou": self.iou, "standard_pred": self.standard_pred, "merge": self.merge,
+                "match_metric": self.match_metric, "match_threshold": self.match_threshold,
+                "class_agnostic": self.class_agnostic}
+
+    def _tiles(self, img):
+        """Görselin (x0, y0, kesit) dilimleri; kesitler kopyasız görünümlerdir (view)."""
+        height, width = img.shape[:2]
+        if self.slice_size is None:
+            return [(0, 0, img)]
+        grid = slice_grid(height, width, self.slice_size, self.slice_size, self.overlap, self.overlap)
+        tiles = [(x1, y1, img[y1:y2, x1:x2]) for x1, y1, x2, y2 in grid.tolist()]
+        covers_image = len(grid) == 1 and tuple(grid[0]) == (0, 0, width, height)
+        if self.standard_pred and not covers_image:
+            tiles.append((0, 0, img))
+        return tiles
+
+    def _run(self, batch):
+        """batch: [(durum, x0, y0, kesit), ...] — tek model çağrısı, sonuçlar durumlara eklenir."""
+        results = list(self.model.predict(source=[tile for _, _, _, tile in batch], conf=self.conf, iou=self.iou,
+                                          device=self.device, verbose=False))
+        self.model_calls += 1
+        for (state, x0, y0, _), res in zip(batch, results):
+            boxes = res.boxes if res is not None else None
+            if boxes is not None and len(boxes):
+                xyxy = _to_numpy(boxes.xyxy).astype(np.float64).reshape(-1, 4) + (x0, y0, x0, y0)
+                state["parts"].append((xyxy, _to_numpy(boxes.conf).astype(np.float64).reshape(-1),
+                                       _to_numpy(boxes.cls).astype(np.int64).reshape(-1)))
+            state["left"] -= 1
+        # Kısa sonuç listesi: sonucu gelmeyen dilimler de tamamlanmış sayılır,
+        # yoksa görsel (ve arkasındaki tüm görseller) hiç üretilmez
+        for state, x0, y0, _ in batch[len(results):]:
+            print(f"Uyarı: Sonuç yok -> {state['path']} dilimi ({x0}, {y0})")
+            state["left"] -= 1
+
+    def _finish(self, state):
+        height, width = state["shape"]
+        if state["parts"]:
+            xyxy = np.concatenate([p[0] for p in state["parts"]])
+            scores = np.concatenate([p[1] for p in state["parts"]])
+            classes = np.concatenate([p[2] for p in state["parts"]])
+            np.clip(xyxy, 0, (width, height, width, height), out=xyxy)
+            if len(state["parts"]) > 1:
+                xyxy, scores, classes = merge_detections(xyxy, scores, classes, self.merge, self.match_metric,
+                                                         self.match_threshold, self.class_agnostic)
+        else:
+            xyxy, scores, classes = np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=np.int64)
+        return state["path"], (height, width), xyxy, scores, classes
+
+    def predict_paths(self, image_paths, decode_threads=4, queue_size=16):
+        """
+        Görselleri arka planda bir kez çözer ve dilimli tahmin eder. Girdi
+        sırasıyla (yol, (h, w), xyxy, skorlar, sınıflar) üretir; okunamayan
+        görseller için (h, w) None'dır.
+        """
+        states, tiles = [], []
+
+        def ready():
+            while states and states[0]["left"] == 0:
+                state = states.pop(0)
+                yield self._finish(state) if state["shape"] is not None else (state["path"], None, None, None, None)
+
+        for path, img in iter_decoded(image_paths, threads=decode_threads, queue_size=queue_size):
+            state = {"path": path, "shape": img.shape[:2] if img is not None else None, "parts": [], "left": 0}
+            states.append(state)
+            if img is not None:
+                image_tiles = self._tiles(img)
+                state["left"] = len(image_tiles)
+                tiles.extend((state, x0, y0, tile) for x0, y0, tile in image_tiles)
+            while len(tiles) >= self.batch_size:
+                self._run(tiles[:self.batch_size])
+                tiles = tiles[self.batch_size:]
+            yield from ready()
+        if tiles:
+            self._run(tiles)
+        yield from ready()
+
+
+def label_images(predictor, image_paths, output_dir, decode_threads=4, journal=None):
+    """
+    Görselleri dilimli tahminle etiketler ve notebook'taki biçimde
+    (<görsel adı>.jpg -> .txt) atomik olarak yazar. journal verilirse zaten
+    etiketlenmiş görseller atlanır. Yazılan görsel sayısını döndürür.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def label_path_for(image_path):
+        return os.path.join(output_dir, os.path.basename(image_path).replace(".jpg", ".txt"))
+
+    image_paths = list(image_paths)
+    if journal is not None:
+        image_paths = [img for img, _ in journal.pending([(img, label_path_for(img)) for img in image_paths])]
+
+    start, written = time.perf_counter(), 0
+    for path, shape, xyxy, _, classes in predictor.predict_paths(image_paths, decode_threads=decode_threads):
+        if shape is None:
+            print(f"Uyarı: Görsel okunamadı -> {path}")
+            continue
+        labels_path = label_path_for(path)
+        atomic_write_text(labels_path, yolo_label_text(xyxy, classes, shape[1], shape[0]))
+        if journal is not None:
+            journal.mark_done(path, labels_path, len(classes))
+        written += 1
+        print(f"Etiket kaydedildi: {labels_path}")
+
+    elapsed = time.perf_counter() - start
+    print(f"🏁 {written} görsel etiketlendi, {predictor.model_calls} model çağrısı, "
+          f"{written / max(elapsed, 1e-9):.1f} görsel/sn")
+    return written
@@ -1,5 +1,7 @@
 import os
 import shutil
+import argparse
+from materialize import materialize, add_materialize_argument
 
 # Ana klasör
 base_dir = r"C:\Users\524ha\Desktop\AYGAZ_DATAS\Datasets\Mini\Mini_1"
@@ -10,7 +12,13 @@ labels_dir = os.path.join(base_dir, "labels")
 
 # 🔧 Çıktı klasörü
 output_dir = os.path.join(base_dir, "sorted_by_class")
+
+parser = argparse.ArgumentParser(description="Görselleri label'larındaki sınıf ID'lerine göre class_<id> klasörlerine ayırır.")
+add_materialize_argument(parser, default="copy")
+args = parser.parse_args()
+
 os.makedirs(output_dir, exist_ok=True)
+methods = {}
 
 # 🔁 Tüm label dosyalarını dolaş
 for label_file in os.listdir(labels_dir):
@@ -33,14 +41,18 @@ for label_file in os.listdir(labels_dir):
 
     class_ids = set(line.split()[0] for line in lines)
 
-    # 🗂️ Her sınıf için ilgili klasörleri oluşturup dosyaları kopyala
+    # 🗂️ Her sınıf için ilgili klasörleri oluşturup dosyaları yerleştir
+    # (görsel --materialize ile linklenebilir, label her zaman kopyalanır)
     for class_id in class_ids:
         class_image_dir = os.path.join(output_dir, f"class_{class_id}", "images")
         class_label_dir = os.path.join(output_dir, f"class_{class_id}", "labels")
         os.makedirs(class_image_dir, exist_ok=True)
         os.makedirs(class_label_dir, exist_ok=True)
 
-        shutil.copy2(image_path, os.path.join(class_image_dir, image_name))
+        method = materialize(image_path, os.path.join(class_image_dir, image_name), args.materialize)
+        methods[method] = methods.get(method, 0) + 1
         shutil.copy2(label_path, os.path.join(class_label_dir, label_file))
 
+if methods:
+    print("🔗 Görsel yerleştirme: " + ", ".join(f"{k}: {v}" for k, v in sorted(methods.items())))
 print("✅ Sınıflara göre ayırma işlemi tamamlandı!")
@@ -2,11 +2,17 @@ import os
 import cv2
 import random
 import shutil
-from colorama import Fore, Style, init
+import time
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from colorama import Fore, init
 from collections import defaultdict
 import argparse
 import albumentations as A
 import matplotlib.pyplot as plt
+from dataset_index import analyze_with_index
+from label_stats import load_label_table, read_yolo_boxes, write_yolo_boxes
 
 # Renkli terminal çıktısı için
 init(autoreset=True)
@@ -37,99 +43,219 @@ def organize_dataset_by_folder(root_path):
                     print(f"{file_path} -> {images_dir}")
 
 
-def analyze_dataset(root_dir, delete_missing=False):
+def analyze_dataset(root_dir, delete_missing=False, index_path=None, profile=False):
     """
     Dataset’i analiz eder. Eksik image veya label varsa listeler.
     Her klasör için stats döndürür: {class_path: {images, labels, missing_images, missing_labels}}
+    Her images/labels klasörü os.scandir ile tek sefer listelenir, eşleştirme kök isim
+    kümeleri üzerinden yapılır. profile=True ise sistem çağrısı sayıları yazdırılır.
+    index_path verilirse analiz kalıcı SQLite indeksinden yapılır (bkz. dataset_index.py);
+    yalnızca mtime'ı değişen klasörler yeniden taranır.
     """
     print(Fore.CYAN + "📂 YOLO Dataset Super Analyzer Başlatıldı...")
+    if index_path:
+        class_stats, deleted_files, refresh = analyze_with_index(root_dir, delete_missing, index_path)
+        print(Fore.LIGHTBLACK_EX + f"🗂️  İndeks: {refresh['scanned']} klasör tarandı, {refresh['skipped']} klasör değişmemiş, "
+              f"{refresh['removed']} klasör silinmiş ({refresh['seconds']:.2f} sn)\n")
+        return class_stats, deleted_files
+
+    start = time.perf_counter()
+    calls = defaultdict(int)  # --profile için sistem çağrısı sayaçları
     class_stats = dict()
     deleted_files = []
 
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        if "images" in dirpath.lower():
-            parent_dir = os.path.dirname(dirpath)
-            class_name = parent_dir  # full path olarak sakla
-            labels_dir = os.path.join(parent_dir, "labels")
-            os.makedirs(labels_dir, exist_ok=True)
-
-            stats = class_stats.setdefault(class_name, {"images": 0, "labels": 0, "missing_labels": [], "missing_images": []})
-
-            for f in filenames:
-                if f.lower().endswith((".jpg", ".jpeg", ".png")):
-                    stats["images"] += 1
-                    label_path = os.path.join(labels_dir, os.path.splitext(f)[0] + ".txt")
-                    if not os.path.exists(label_path):
-                        stats["missing_labels"].append(os.path.join(dirpath, f))
-                        if delete_missing:
-                            os.remove(os.path.join(dirpath, f))
-                            deleted_files.append(os.path.join(dirpath, f))
-        elif "labels" in dirpath.lower():
-            parent_dir = os.path.dirname(dirpath)
-            class_name = parent_dir
-            images_dir = os.path.join(parent_dir, "images")
-            os.makedirs(images_dir, exist_ok=True)
-
-            stats = class_stats.setdefault(class_name, {"images": 0, "labels": 0, "missing_labels": [], "missing_images": []})
-
-            for f in filenames:
-                if f.lower().endswith(".txt"):
-                    stats["labels"] += 1
-                    img_found = False
-                    for ext in [".jpg", ".jpeg", ".png"]:
-                        img_path = os.path.join(images_dir, os.path.splitext(f)[0] + ext)
-                        if os.path.exists(img_path):
-                            img_found = True
-                            break
-                    if not img_found:
-                        stats["missing_images"].append(os.path.join(dirpath, f))
-                        if delete_missing:
-                            os.remove(os.path.join(dirpath, f))
-                            deleted_files.append(os.path.join(dirpath, f))
+    # 1) Her klasörü os.scandir ile yalnızca bir kez listele; images/labels içeriklerini topla
+    class_dirs = {}  # class_path -> {"images": [dosyalar], "labels": [dosyalar]}
+    stack = [root_dir]
+    while stack:
+        dirpath = stack.pop()
+        calls["scandir"] += 1
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        stack.extend(e.path for e in reversed(entries) if e.is_dir(follow_symlinks=False))
+        kind = os.path.basename(dirpath).lower()
+        if kind in ("images", "labels"):
+            class_dirs.setdefault(os.path.dirname(dirpath), {})[kind] = [e.name for e in entries if e.is_file()]
+
+    # 2) Kök isim kümeleri ve küme farkları ile eşleştirme (dosya başına exists() yok)
+    old_exists_calls = 0
+    for class_name, listing in class_dirs.items():
+        images_dir = os.path.join(class_name, "images")
+        labels_dir = os.path.join(class_name, "labels")
+        for d, kind in ((images_dir, "images"), (labels_dir, "labels")):
+            if kind not in listing:
+                calls["makedirs"] += 1
+                os.makedirs(d, exist_ok=True)
+
+        img_files = [f for f in listing.get("images", []) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+        lbl_files = [f for f in listing.get("labels", []) if f.lower().endswith(".txt")]
+        img_exts = defaultdict(set)
+        for f in img_files:
+            stem, ext = os.path.splitext(f)
+            img_exts[os.path.normcase(stem)].add(ext.lower())
+        lbl_stems = {os.path.normcase(os.path.splitext(f)[0]) for f in lbl_files}
+
+        stats = class_stats.setdefault(class_name, {"images": 0, "labels": 0, "missing_labels": [], "missing_images": []})
+        stats["images"] = len(img_files)
+        stats["labels"] = len(lbl_files)
+        stats["missing_labels"] = [os.path.join(images_dir, f) for f in img_files
+                                   if os.path.normcase(os.path.splitext(f)[0]) not in lbl_stems]
+        stats["missing_images"] = [os.path.join(labels_dir, f) for f in lbl_files
+                                   if os.path.normcase(os.path.splitext(f)[0]) not in img_exts]
+
+        # Eski yöntemin yapacağı exists() sayısı: görsel başına 1, label başına ilk bulunan uzantıya kadar (en fazla 3)
+        old_exists_calls += len(img_files)
+        for f in lbl_files:
+            exts = img_exts.get(os.path.normcase(os.path.splitext(f)[0]), ())
+            old_exists_calls += next((i + 1 for i, e in enumerate((".jpg", ".jpeg", ".png")) if e in exts), 3)
+
+        if delete_missing:
+            for path in stats["missing_labels"] + stats["missing_images"]:
+                calls["remove"] += 1
+                os.remove(path)
+                deleted_files.append(path)
+
+    if profile:
+        elapsed = time.perf_counter() - start
+        print(Fore.LIGHTBLACK_EX + "⏱️  Profil:")
+        print(Fore.LIGHTBLACK_EX + f"   Süre: {elapsed:.3f} sn  |  Sınıf klasörü: {len(class_dirs)}")
+        print(Fore.LIGHTBLACK_EX + f"   os.scandir: {calls['scandir']}  |  os.makedirs: {calls['makedirs']}  |  "
+              f"os.remove: {calls['remove']}  |  os.path.exists: 0")
+        print(Fore.LIGHTBLACK_EX + f"   Eski yöntem (os.walk + exists) tahmini: {old_exists_calls} exists() çağrısı\n")
 
     return class_stats, deleted_files
 
 
-def augment_images(class_stats, augment_count=2):
-    """
-    Her klasörde augmentasyon uygular.
-    """
-    print(Fore.MAGENTA + "🧪 Augmentasyon işlemi başlatılıyor...\n")
-    transform = A.Compose([
+def _build_augment_transform():
+    return A.Compose([
         A.HorizontalFlip(p=0.5),
         A.RandomBrightnessContrast(p=0.3),
         A.Rotate(limit=10, p=0.3),
-    ])
+    ], bbox_params=A.BboxParams(format="yolo", label_fields=["class_labels"],
+                                min_visibility=0.3, min_width=4, min_height=4))
 
-    for class_path, stats in class_stats.items():
-        img_dir = os.path.join(class_path, "images")
-        label_dir = os.path.join(class_path, "labels")
 
-        if not os.path.exists(img_dir) or not os.path.exists(label_dir):
-            continue
+_worker_transform = None
 
-        img_files = [f for f in os.listdir(img_dir) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
-        if not img_files:
-            continue
 
-        for img_file in random.sample(img_files, min(len(img_files), augment_count)):
-            img_path = os.path.join(img_dir, img_file)
-            image = cv2.imread(img_path)
-            if image is None:
-                continue
+def _augment_worker_init():
+    """Her işçi süreç transform'u bir kez oluşturur; OpenCV kendi iş parçacıklarını açmaz."""
+    global _worker_transform
+    cv2.setNumThreads(1)
+    _worker_transform = _build_augment_transform()
+
+
+def _seeded_transform(seed, **data):
+    """
+    Transform'u verilen seed ile çalıştırır; aynı seed her çalıştırmada aynı
+    augmentasyonu üretir. Yeni Albumentations sürümleri kendi yerel RNG'sini
+    (set_random_seed) kullanır; eski sürümler global random/np.random'a
+    bağlı olduğundan onların durumu çağrıdan sonra geri yüklenir ve çağıranın
+    (seri yolda ana sürecin) RNG durumu değişmez.
+    """
+    if hasattr(_worker_transform, "set_random_seed"):
+        _worker_transform.set_random_seed(seed)
+        return _worker_transform(**data)
+    py_state, np_state = random.getstate(), np.random.get_state()
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        return _worker_transform(**data)
+    finally:
+        random.setstate(py_state)
+        np.random.set_state(np_state)
+
+
+def _augment_one(job):
+    """
+    Tek bir görüntüyü ve label'ını okur, ikisini aynı çağrıda augment eder ve
+    yazar. Döndürülen/kırpılan kutular dönüştürülür; çerçeve dışına çıkan veya
+    çok küçülen kutular atılır. Yazılan görüntü yolunu (ya da okunamadıysa None)
+    döndürür; görüntü ana sürece geri gönderilmez.
+    """
+    global _worker_transform
+    img_path, src_label, out_path, dst_label, seed = job
+    if _worker_transform is None:
+        # Seri yol (workers=1): ana süreçte OpenCV iş parçacığı ayarına dokunulmaz
+        _worker_transform = _build_augment_transform()
+    image = cv2.imread(img_path)
+    if image is None:
+        return None
+    has_label = os.path.exists(src_label)
+    bboxes, class_labels = read_yolo_boxes(src_label) if has_label else ([], [])
+    aug = _seeded_transform(seed, image=image, bboxes=bboxes, class_labels=class_labels)
+    cv2.imwrite(out_path, aug["image"])
+    if has_label:
+        write_yolo_boxes(dst_label, aug["bboxes"], aug["class_labels"])
+    return out_path
+
+
+def _job_seed(seed, path, root_dir):
+    # Köke göreli yol: farklı sınıf klasörlerindeki aynı isimli dosyalar farklı seed alır,
+    # veri seti başka bir yere taşınsa da seed'ler değişmez
+    rel = os.path.relpath(path, root_dir).replace(os.sep, "/")
+    return zlib.crc32(f"{seed}:{rel}".encode("utf-8"))
+
+
+def augment_images(class_stats, augment_count=2, workers=1, seed=0, root_dir=None):
+    """
+    Her klasörde augmentasyon uygular.
 
-            aug = transform(image=image)
-            aug_img = aug["image"]
-            new_name = os.path.splitext(img_file)[0] + "_aug.jpg"
-            cv2.imwrite(os.path.join(img_dir, new_name), aug_img)
+    workers > 1 ise görüntüler bir süreç havuzunda (ProcessPool) işlenir.
+    Her görüntünün seed'i (seed, root_dir'e göreli yol) çiftinden türetildiği
+    için sonuç işçi sayısından ve bitiş sırasından bağımsızdır (root_dir
+    verilmezse sınıf klasörlerinin ortak üst klasörü kullanılır). Aynı anda en fazla
+    workers * 2 iş bekletilir; böylece büyük (4K) görüntülerde bellek sabit kalır.
+    Label'lar kopyalanmaz, kutularla birlikte dönüştürülüp işçide yazılır.
+    """
+    print(Fore.MAGENTA + "🧪 Augmentasyon işlemi başlatılıyor...\n")
+    if root_dir is None:
+        root_dir = os.path.commonpath([os.path.abspath(p) for p in class_stats]) if class_stats else "."
+    root_dir = os.path.abspath(root_dir)
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_augment_worker_init) if workers > 1 else None
+    max_in_flight = max(1, workers) * 2
+    try:
+        for class_path, stats in class_stats.items():
+            img_dir = os.path.join(class_path, "images")
+            label_dir = os.path.join(class_path, "labels")
+
+            if not os.path.exists(img_dir) or not os.path.exists(label_dir):
+                continue
 
-            # Label kopyala
-            src_label = os.path.join(label_dir, os.path.splitext(img_file)[0] + ".txt")
-            dst_label = os.path.join(label_dir, os.path.splitext(new_name)[0] + ".txt")
-            if os.path.exists(src_label):
-                shutil.copy(src_label, dst_label)
+            img_files = sorted(f for f in os.listdir(img_dir) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+            if not img_files:
+                continue
 
-        print(Fore.CYAN + f"✨ {os.path.basename(class_path)} sınıfına augmentasyon uygulandı ({augment_count} adet).")
+            rng = random.Random(_job_seed(seed, os.path.abspath(class_path), root_dir))
+            jobs = []
+            for img_file in rng.sample(img_files, min(len(img_files), augment_count)):
+                new_name = os.path.splitext(img_file)[0] + "_aug.jpg"
+                img_path = os.path.join(img_dir, img_file)
+                jobs.append((img_path,
+                             os.path.join(label_dir, os.path.splitext(img_file)[0] + ".txt"),
+                             os.path.join(img_dir, new_name),
+                             os.path.join(label_dir, os.path.splitext(new_name)[0] + ".txt"),
+                             _job_seed(seed, os.path.abspath(img_path), root_dir)))
+
+            if executor is None:
+                for job in jobs:
+                    _augment_one(job)
+            else:
+                pending = set()
+                for job in jobs:
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for f in done:
+                            f.result()
+                    pending.add(executor.submit(_augment_one, job))
+                for f in pending:
+                    f.result()
+
+            print(Fore.CYAN + f"✨ {os.path.basename(class_path)} sınıfına augmentasyon uygulandı ({augment_count} adet).")
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     print(Fore.GREEN + "\n🎉 Augmentasyon işlemi tamamlandı!\n")
 
@@ -211,41 +337,41 @@ def delete_classes_txt(root_dir):
     print(Fore.LIGHTBLACK_EX + f"Toplam {len(deleted)} classes.txt dosyası silindi.\n")
     return deleted
 
-def detailed_analysis(root_dir):
+def detailed_analysis(root_dir, cache_dir=None):
     """
-    Her klasördeki label dosyalarını açar ve 
-    her bir bounding box index'i için kaç adet olduğunu sayar.
-    Ayrıca her class ID için 1 örnek label dosyasının ismini gösterir.
+    Her klasördeki label dosyalarındaki her bir bounding box index'i için
+    kaç adet olduğunu sayar. Ayrıca her class ID için 1 örnek label dosyasının
+    ismini ve kutu boyutu dağılımını gösterir.
+    Etiketler label_stats.py ile NumPy dizilerine yüklenir ve mtime'a göre
+    önbelleklenir; değişmeyen dosyalar tekrar açılmaz.
     """
     print(Fore.MAGENTA + "🔎 Detaylı Analiz Başlatıldı...\n")
 
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        if "labels" in dirpath.lower():
-            class_name = os.path.basename(os.path.dirname(dirpath))
-            index_counts = defaultdict(int)
-            sample_files = {}  # class ID -> örnek label dosyası
-            total_labels = 0
-
-            for f in filenames:
-                if f.lower().endswith(".txt"):
-                    total_labels += 1
-                    path = os.path.join(dirpath, f)
-                    with open(path, "r") as file:
-                        for line in file:
-                            parts = line.strip().split()
-                            if len(parts) > 0:
-                                index = parts[0]  # YOLO class ID
-                                index_counts[index] += 1
-                                # Eğer örnek dosya yoksa kaydet
-                                if index not in sample_files:
-                                    sample_files[index] = f
-
-            print(Fore.CYAN + f"📁 Klasör: {class_name} ({dirpath})")
-            print(Fore.WHITE + f"  Toplam label dosyası: {total_labels}")
-            for idx, count in index_counts.items():
+    table = load_label_table(root_dir, cache_dir=cache_dir)
+    counts, class_ids = table.folder_class_counts()
+    files_per_folder = table.files_per_folder()
+    samples = table.sample_files()
+
+    for folder_idx, folder in enumerate(table.folders):
+        dirpath = os.path.join(root_dir, folder)
+        class_name = os.path.basename(os.path.dirname(dirpath))
+        print(Fore.CYAN + f"📁 Klasör: {class_name} ({dirpath})")
+        print(Fore.WHITE + f"  Toplam label dosyası: {files_per_folder[folder_idx]}")
+        for col, idx in enumerate(class_ids):
+            count = counts[folder_idx, col]
+            if count:
                 print(Fore.YELLOW + f"  Class ID {idx}: {count} bounding box")
-                print(Fore.GREEN + f"    Örnek label dosyası: {sample_files[idx]}")
-            print()
+                print(Fore.GREEN + f"    Örnek label dosyası: {os.path.basename(samples[(folder_idx, idx)])}")
+        print()
+
+    summary = table.box_size_summary()
+    if summary:
+        print(Fore.CYAN + "📐 Kutu boyutu dağılımı (normalize, yüzdelikler: "
+              + "/".join(f"p{p}" for p in summary["percentiles"]) + ")")
+        for key, label in (("w", "Genişlik"), ("h", "Yükseklik"), ("area", "Alan")):
+            print(Fore.WHITE + f"  {label:<9}: " + "  ".join(f"{v:.4f}" for v in summary[key]))
+        print(Fore.WHITE + "  Toplam: " + ", ".join(f"ID {k}: {v}" for k, v in table.class_histogram().items()))
+        print()
     print(Fore.GREEN + "✅ Detaylı analiz tamamlandı!\n")
 
 if __name__ == "__main__":
@@ -253,11 +379,18 @@ if __name__ == "__main__":
     parser.add_argument("--path", type=str, default=".", help="Analiz edilecek ana klasör yolu")
     parser.add_argument("--augment", action="store_true", help="Augmentasyon işlemi uygula")
     parser.add_argument("--count", type=int, default=2, help="Her klasörde augment edilecek görüntü sayısı")
+    parser.add_argument("--workers", type=int, default=1, help="Augmentasyon için paralel süreç sayısı")
+    parser.add_argument("--seed", type=int, default=0, help="Augmentasyon seed'i (aynı seed = aynı çıktı)")
     parser.add_argument("--delete-missing", action="store_true", help="Eşi olmayan (image veya label) dosyaları sil")
     parser.add_argument("--organize-subfolders", action="store_true", help="Alt klasörleri organize et")
     parser.add_argument("--delete-classestxt", action="store_true", help="classes.txt dosyalarını sil")
     parser.add_argument("--detailed", action="store_true", help="Her label içindeki class ID bazlı detaylı analiz yap")
     parser.add_argument("--save-graph", action="store_true", help="Her klasör için image/label sayısını grafikte kaydet")
+    parser.add_argument("--label-cache", type=str, default=None,
+                        help="Detaylı analiz için label önbellek klasörü (varsayılan: <path>/.label_cache)")
+    parser.add_argument("--profile", action="store_true", help="Analiz süresini ve sistem çağrısı sayılarını yazdır")
+    parser.add_argument("--index", nargs="?", const="", default=None, metavar="INDEX_PATH",
+                        help="Analizi kalıcı SQLite indeksiyle yap (varsayılan: <path>/.dataset_index.sqlite)")
 
     args = parser.parse_args()
 
@@ -265,18 +398,22 @@ if __name__ == "__main__":
         print(Fore.YELLOW + "📂 Alt klasörler organize ediliyor...")
         organize_dataset_by_folder(args.path)
 
-    stats, deleted = analyze_dataset(args.path, delete_missing=args.delete_missing)
+    index_path = None
+    if args.index is not None:
+        index_path = args.index or os.path.join(args.path, ".dataset_index.sqlite")
+    stats, deleted = analyze_dataset(args.path, delete_missing=args.delete_missing, index_path=index_path,
+                                     profile=args.profile)
     print_stats(stats, deleted_files=deleted)
     
     if args.save_graph:
         save_graphs(args.path)
     
     if args.augment:
-        augment_images(stats, augment_count=args.count)
+        augment_images(stats, augment_count=args.count, workers=args.workers, seed=args.seed, root_dir=args.path)
 
     if args.delete_classestxt:
         delete_classes_txt(args.path)
 
     if args.detailed:
-        detailed_analysis(args.path)
+        detailed_analysis(args.path, cache_dir=args.label_cache)
 
@@ -0,0 +1,610 @@
+import os
+import copy
+import time
+import queue
+import multiprocessing as mp
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+# labels: labels only; frames: frame JPEGs + labels; full: frames + labels + annotated previews
+OUTPUT_MODES = ("labels", "frames", "full")
+PREVIEW_FORMATS = ("jpg", "mp4")  # per-frame annotated JPEGs or one small MP4 per video
+
+
+class StrideSampler:
+    """
+    Keep every `stride`-th frame (1-based, same as the old `i % 3 == 0` loop).
+    Skipped frames are only grab()bed: the backend advances past them but
+    they are never converted to BGR or copied into a numpy array, which is
+    where most of cap.read()'s cost goes.
+    """
+
+    def __init__(self, stride=3):
+        self.stride = stride
+        self.frames_read = 0
+        self.kept = 0
+
+    def frames(self, cap):
+        """Yield (frame_number, frame) for the kept frames of an opened capture."""
+        self.frames_read = self.kept = 0
+        while True:
+            if not cap.grab():
+                return
+            self.frames_read += 1
+            if self.frames_read % self.stride:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                return
+            self.kept += 1
+            yield self.frames_read, frame
+
+    def stats(self):
+        return {"frames_read": self.frames_read, "kept": self.kept, "skipped": self.frames_read - self.kept}
+
+
+class MotionSampler:
+    """
+    Adaptive sampler: keep a frame only when the scene has changed enough
+    since the last kept frame, or when `max_interval` frames have passed
+    without one. The first frame is always kept.
+
+    Frames are compared as small grayscale thumbnails (`size`), so scoring
+    costs far less than inference:
+        method="diff": mean absolute pixel difference, 0..1
+        method="hist": Bhattacharyya distance of 32-bin histograms, 0..1
+    (histograms ignore small camera shake; diff also reacts to objects moving
+    within a static histogram).
+
+    Frames closer than `min_interval` to the last kept one are only grab()bed,
+    and with check_stride > 1 only every check_stride-th frame is scored.
+    """
+
+    METHODS = ("diff", "hist")
+
+    def __init__(self, threshold=0.04, max_interval=150, min_interval=3, method="diff", size=(64, 64),
+                 check_stride=1):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method: {method} (choices: {', '.join(self.METHODS)})")
+        self.threshold = threshold
+        self.max_interval = max_interval
+        self.min_interval = max(min_interval, 1)
+        self.method = method
+        self.size = size
+        self.check_stride = max(check_stride, 1)
+        self.frames_read = 0
+        self.kept = 0
+        self.changed = 0
+        self.interval = 0
+
+    def _signature(self, frame):
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self.method == "hist":
+            hist = cv2.calcHist([small], [0], None, [32], [0, 256])
+            return cv2.normalize(hist, hist, norm_type=cv2.NORM_L1)
+        return small
+
+    def _score(self, signature, reference):
+        if self.method == "hist":
+            return cv2.compareHist(signature, reference, cv2.HISTCMP_BHATTACHARYYA)
+        return float(cv2.absdiff(signature, reference).mean()) / 255.0
+
+    def frames(self, cap):
+        """Yield (frame_number, frame) for the kept frames of an opened capture."""
+        self.frames_read = self.kept = self.changed = self.interval = 0
+        reference, last_kept = None, 0
+        while True:
+            if not cap.grab():
+                return
+            self.frames_read += 1
+            since = self.frames_read - last_kept
+            due = reference is None or since >= self.max_interval
+            if not due and (since < self.min_interval or since % self.check_stride):
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                return
+            signature = self._signature(frame)
+            if not due:
+                if self._score(signature, reference) < self.threshold:
+                    continue
+                self.changed += 1
+            elif reference is not None:
+                self.interval += 1
+            reference, last_kept = signature, self.frames_read
+            self.kept += 1
+            yield self.frames_read, frame
+
+    def stats(self):
+        return {"frames_read": self.frames_read, "kept": self.kept, "skipped": self.frames_read - self.kept,
+                "scene_changes": self.changed, "max_interval": self.interval}
+
+
+def sampler_summary(stats):
+    """One log line out of a sampler's stats()."""
+    line = f"kept {stats['kept']} of {stats['frames_read']} frames ({stats['skipped']} skipped"
+    if "scene_changes" in stats:
+        line += f"; {stats['scene_changes']} scene changes, {stats['max_interval']} max-interval keeps"
+    return line + ")"
+
+
+def _to_numpy(x):
+    # torch tensor (ultralytics) or a plain numpy array
+    return x.cpu().numpy() if hasattr(x, "cpu") else np.asarray(x)
+
+
+def yolo_lines(xyxy, cls, img_width, img_height):
+    """
+    YOLO label lines for pixel xyxy boxes. Coordinates are truncated to int
+    first, exactly like the per-box loop this replaces, so labels are
+    byte-identical.
+    """
+    xyxy = np.asarray(xyxy).reshape(-1, 4).astype(int)
+    width = xyxy[:, 2] - xyxy[:, 0]
+    height = xyxy[:, 3] - xyxy[:, 1]
+    center_x = (xyxy[:, 0] + width / 2) / img_width
+    center_y = (xyxy[:, 1] + height / 2) / img_height
+    rows = zip(np.asarray(cls).astype(int).tolist(), center_x.tolist(), center_y.tolist(),
+               (width / img_width).tolist(), (height / img_height).tolist())
+    return [f"{c} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n" for c, cx, cy, w, h in rows]
+
+
+def draw_boxes(frame, xyxy, conf, cls):
+    """Draw detection boxes on a copy of the frame."""
+    annotated_frame = frame.copy()
+    for (x1, y1, x2, y2), score, class_id in zip(np.asarray(xyxy).reshape(-1, 4).astype(int).tolist(),
+                                                  np.asarray(conf).tolist(), np.asarray(cls).astype(int).tolist()):
+        cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f"Class {class_id}: {score:.2f}"
+        cv2.putText(annotated_frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    return annotated_frame
+
+
+def threaded_frames(frames, queue_size=32):
+    """
+    Run a frame generator on a background thread and hand its items over a
+    bounded queue, so decoding overlaps with inference.
+    """
+    q = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in frames:
+                while not stop.is_set():
+                    try:
+                        q.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:  # re-raised on the consumer side
+            q.put(e)
+        q.put(_END)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class FrameWriter:
+    """
+    Thread pool for JPEG encoding, box drawing and label writes. At most
+    `max_pending` jobs are in flight; submit() blocks on the oldest one
+    beyond that, which keeps memory bounded when the disk is slower than
+    inference.
+    """
+
+    def __init__(self, threads=4, max_pending=64):
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.pending = deque()
+        self.max_pending = max_pending
+
+    def submit(self, fn, *args):
+        self.pending.append(self.pool.submit(fn, *args))
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft().result()
+
+    def close(self):
+        try:
+            while self.pending:
+                self.pending.popleft().result()
+        finally:
+            self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _write_frame_outputs(frame, frame_path, annotation_path, annotated_path, xyxy, conf, cls):
+    """Write the outputs of one kept frame; a None path skips that output."""
+    if frame_path is not None:
+        cv2.imwrite(frame_path, frame)
+    if len(xyxy) == 0:
+        open(annotation_path, "w").close()
+        return
+    img_height, img_width = frame.shape[:2]
+    with open(annotation_path, "w") as f:
+        f.writelines(yolo_lines(xyxy, cls, img_width, img_height))
+    if annotated_path is not None:
+        cv2.imwrite(annotated_path, draw_boxes(frame, xyxy, conf, cls))
+
+
+class PreviewVideo:
+    """
+    Annotated previews of one video as a single MP4 instead of per-frame
+    JPEGs. Frames are downscaled by `scale` before the boxes are drawn
+    (smaller file, cheaper encode) and written in order on a dedicated
+    thread; at most `max_pending` frames wait for the encoder.
+    """
+
+    def __init__(self, path, fps=8.0, scale=0.5, max_pending=64):
+        self.path = path
+        self.fps = fps
+        self.scale = scale
+        self.writer = None
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.pending = deque()
+        self.max_pending = max_pending
+
+    def add(self, frame, xyxy, conf, cls):
+        self.pending.append(self.pool.submit(self._write, frame, xyxy, conf, cls))
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft().result()
+
+    def _write(self, frame, xyxy, conf, cls):
+        if self.scale != 1:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            xyxy = np.asarray(xyxy) * self.scale
+        if len(xyxy):
+            frame = draw_boxes(frame, xyxy, conf, cls)
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (width, height))
+        self.writer.write(frame)
+
+    def close(self):
+        try:
+            while self.pending:
+                self.pending.popleft().result()
+        finally:
+            self.pool.shutdown(wait=True)
+            if self.writer is not None:
+                self.writer.release()
+
+
+class VideoOutputs:
+    """Output folders, per-frame file names and the optional MP4 preview of one video."""
+
+    def __init__(self, video_path, output_folder, mode="full", preview="jpg", preview_fps=8.0, preview_scale=0.5):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {mode} (choices: {', '.join(OUTPUT_MODES)})")
+        if preview not in PREVIEW_FORMATS:
+            raise ValueError(f"Unknown preview format: {preview} (choices: {', '.join(PREVIEW_FORMATS)})")
+        self.base_name = os.path.basename(video_path).split(".")[0]
+        self.frame_folder = os.path.join(output_folder, "images") if mode != "labels" else None
+        self.annotation_folder = os.path.join(output_folder, "labels")
+        self.annotated_frame_folder = None
+        self.preview = None
+        if mode == "full" and preview == "jpg":
+            self.annotated_frame_folder = os.path.join(output_folder, "annotateds")
+        for folder in (self.frame_folder, self.annotation_folder, self.annotated_frame_folder):
+            if folder is not None:
+                os.makedirs(folder, exist_ok=True)
+        if mode == "full" and preview == "mp4":
+            self.preview = PreviewVideo(os.path.join(output_folder, f"{self.base_name}_preview.mp4"),
+                                        preview_fps, preview_scale)
+
+    def paths(self, frame_number):
+        """(frame jpg, label txt, annotated jpg) paths of a kept frame; None for disabled outputs."""
+        frame_path = annotated_path = None
+        if self.frame_folder is not None:
+            frame_path = os.path.join(self.frame_folder, f"{self.base_name}_0411_{frame_number:06d}.jpg")
+        if self.annotated_frame_folder is not None:
+            annotated_path = os.path.join(self.annotated_frame_folder, f"0508_{frame_number:06d}_annotated.jpg")
+        return (frame_path,
+                os.path.join(self.annotation_folder, f"{self.base_name}_0411_{frame_number:06d}.txt"),
+                annotated_path)
+
+    def submit(self, writer, frame_number, frame, xyxy, conf, cls):
+        """Queue the outputs of one kept frame on the writer pool (and the preview encoder)."""
+        writer.submit(_write_frame_outputs, frame, *self.paths(frame_number), xyxy, conf, cls)
+        if self.preview is not None:
+            self.preview.add(frame, xyxy, conf, cls)
+
+    def close(self):
+        """Finish the MP4 preview, if any."""
+        if self.preview is not None:
+            self.preview.close()
+
+
+def _decode_video(video_id, video_path, sampler, out_queue):
+    """
+    Decoder process for the multi-video scheduler: streams the kept frames of
+    one video into a shared queue as ("start" | "frame" | "end", video_id, ...)
+    messages.
+    """
+    cv2.setNumThreads(1)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        out_queue.put(("end", video_id, 0, f"Error opening video file: {video_path}", None))
+        return
+    try:
+        out_queue.put(("start", video_id, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))))
+        for frame_number, frame in sampler.frames(cap):
+            out_queue.put(("frame", video_id, frame_number, frame))
+        out_queue.put(("end", video_id, sampler.frames_read, None, sampler.stats()))
+    except Exception as e:
+        out_queue.put(("end", video_id, sampler.frames_read, str(e), sampler.stats()))
+    finally:
+        cap.release()
+
+
+def _format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class _VideoProgress:
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.name = os.path.basename(video_path)
+        self.total_frames = 0
+        self.frames_read = 0
+        self.kept = 0
+        self.detections = 0
+        self.start = time.perf_counter()
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        fps = self.frames_read / elapsed
+        if self.total_frames:
+            remaining = max(self.total_frames - self.frames_read, 0)
+            eta = _format_eta(remaining / fps) if fps > 0 else "?"
+            return (f"{self.name}: {self.frames_read}/{self.total_frames} frames "
+                    f"({100 * self.frames_read / self.total_frames:.1f}%), {fps:.1f} fps, ETA {eta}")
+        return f"{self.name}: {self.frames_read} frames, {fps:.1f} fps"
+
+
+class ObjectDetector:
+    def __init__(self, model_path, conf_threshold=0.05, batch_size=8, frame_stride=3,
+                 writer_threads=4, queue_size=32, sampler=None, output_mode="full", preview="jpg",
+                 preview_fps=8.0, preview_scale=0.5):
+        """
+        Initialize the detector with a model path (or an already loaded model
+        with an ultralytics-style predict()) and confidence threshold.
+
+        batch_size    : kept frames per model.predict call
+        frame_stride  : keep every N-th frame (when no sampler is given)
+        sampler       : frame sampler prototype (StrideSampler, MotionSampler),
+                        copied for every video
+        output_mode   : "labels" (labels only), "frames" (frame JPEGs + labels)
+                        or "full" (frames + labels + annotated previews)
+        preview       : "jpg" (one annotated JPEG per frame with detections) or
+                        "mp4" (every kept frame in one <video>_preview.mp4,
+                        downscaled by preview_scale, at preview_fps)
+        writer_threads: threads for JPEG encoding and file writes
+        queue_size    : decoded frames buffered ahead of inference
+        """
+        if isinstance(model_path, (str, os.PathLike)):
+            from ultralytics import YOLO
+            self.model = YOLO(model_path)
+        else:
+            self.model = model_path
+        self.conf_threshold = conf_threshold
+        self.batch_size = batch_size
+        self.frame_stride = frame_stride
+        self.writer_threads = writer_threads
+        self.queue_size = queue_size
+        self.sampler = sampler
+        self.output_mode = output_mode
+        self.preview = preview
+        self.preview_fps = preview_fps
+        self.preview_scale = preview_scale
+
+    def make_outputs(self, video_path, output_folder):
+        return VideoOutputs(video_path, output_folder, self.output_mode, self.preview,
+                            self.preview_fps, self.preview_scale)
+
+    def make_sampler(self):
+        if self.sampler is not None:
+            return copy.deepcopy(self.sampler)
+        return StrideSampler(self.frame_stride)
+
+    def predict_batch(self, frames, target_classes=None):
+        """Run the model once on a list of frames; returns (xyxy, conf, cls) numpy arrays per frame."""
+        results = self.model.predict(list(frames), conf=self.conf_threshold, iou=0,
+                                     classes=target_classes, verbose=False)
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                detections.append((np.zeros((0, 4)), np.zeros(0), np.zeros(0)))
+            else:
+                detections.append((_to_numpy(boxes.xyxy), _to_numpy(boxes.conf), _to_numpy(boxes.cls)))
+        return detections
+
+    def _run_batch(self, batch, writer, target_classes):
+        """
+        batch: [(outputs, progress, frame_number, frame), ...], possibly from
+        several videos. One model call, then the writes go to the writer pool.
+        """
+        detections = self.predict_batch([item[3] for item in batch], target_classes)
+        for (outputs, progress, frame_number, frame), (xyxy, conf, cls) in zip(batch, detections):
+            progress.kept += 1
+            progress.detections += len(xyxy)
+            if len(xyxy):
+                logger.debug(f"Frame {frame_number}: Found {len(xyxy)} objects")
+                logger.debug(f"Classes detected: {cls}")
+                logger.debug(f"Confidence scores: {conf}")
+            else:
+                logger.debug(f"Frame {frame_number}: No detections (empty label saved)")
+            outputs.submit(writer, frame_number, frame, xyxy, conf, cls)
+
+    def process_video(self, video_path, output_folder, target_classes=None):
+        """
+        Process video and save frames with detections.
+        Every kept frame is saved with its label (an empty file when nothing
+        is detected); frames with detections also get an annotated copy.
+
+        Pipeline: a decode thread grab()s past skipped frames and queues the
+        kept ones, the main thread batches them through the model, and a
+        writer pool encodes JPEGs and writes labels in the background.
+        """
+        # Open video
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Error opening video file: {video_path}")
+
+        outputs = self.make_outputs(video_path, output_folder)
+        progress = _VideoProgress(video_path)
+        sampler = self.make_sampler()
+
+        try:
+            with FrameWriter(self.writer_threads, max_pending=2 * self.queue_size) as writer:
+                batch = []
+                for frame_number, frame in threaded_frames(sampler.frames(cap), self.queue_size):
+                    batch.append((outputs, progress, frame_number, frame))
+                    if len(batch) >= self.batch_size:
+                        self._run_batch(batch, writer, target_classes)
+                        batch = []
+                if batch:
+                    self._run_batch(batch, writer, target_classes)
+        finally:
+            cap.release()
+            outputs.close()
+
+        frame_count = sampler.frames_read
+        elapsed = time.perf_counter() - progress.start
+        logger.info(f"Processing complete. Total frames: {frame_count}")
+        logger.info(f"Kept frames: {progress.kept} ({progress.kept / max(elapsed, 1e-9):.1f} frames/s)")
+        logger.info(f"Sampler: {sampler_summary(sampler.stats())}")
+        logger.info(f"Total detections: {progress.detections}")
+        return frame_count, progress.detections
+
+    def process_videos(self, video_files, output_base, target_classes=None, decode_workers=2,
+                       progress_interval=10.0):
+        """
+        Process several videos at once. Each video is decoded in its own
+        process (at most `decode_workers` at a time); this process owns the
+        single model instance and fills every batch with kept frames from
+        whichever videos have them ready. Outputs go to
+        output_base/<video name>/ exactly as process_video would write them.
+        Per-video progress, fps and ETA are logged every `progress_interval`
+        seconds.
+
+        Returns {video_file: (frames, detections)} for the videos that finished.
+        """
+        ctx = mp.get_context("spawn")  # same behaviour on Windows and Linux
+        frame_queue = ctx.Queue(maxsize=self.queue_size)
+        waiting = list(enumerate(video_files))
+        active, progress, outputs, results = {}, {}, {}, {}
+        exited = set()
+        last_report = time.perf_counter()
+
+        def start_next():
+            video_id, video_file = waiting.pop(0)
+            progress[video_id] = _VideoProgress(video_file)
+            proc = ctx.Process(target=_decode_video, args=(video_id, video_file, self.make_sampler(), frame_queue),
+                               daemon=True)
+            proc.start()
+            active[video_id] = proc
+            logger.info(f"Processing video: {video_file}")
+
+        def finish(video_id, frames_read, error, sampler_stats=None):
+            active.pop(video_id).join()
+            if video_id in outputs:
+                outputs.pop(video_id).close()
+            info = progress[video_id]
+            if error:
+                logger.error(f"Error processing {info.video_path}: {error}")
+            else:
+                info.frames_read = frames_read
+                results[info.video_path] = (frames_read, info.detections)
+                logger.info(f"Completed processing {info.video_path}")
+                logger.info(f"Processed {frames_read} frames with {info.detections} total detections "
+                            f"({frames_read / max(time.perf_counter() - info.start, 1e-9):.1f} fps)")
+                if sampler_stats:
+                    logger.info(f"Sampler: {sampler_summary(sampler_stats)}")
+            if waiting:
+                start_next()
+
+        try:
+            with FrameWriter(self.writer_threads, max_pending=2 * self.queue_size) as writer:
+                while waiting and len(active) < decode_workers:
+                    start_next()
+                batch = []
+                while active or batch:
+                    try:
+                        message = frame_queue.get(timeout=0.05 if batch else 1.0)
+                    except queue.Empty:
+                        # Nothing new: run the partial batch instead of waiting for it to fill
+                        if batch:
+                            self._run_batch(batch, writer, target_classes)
+                            batch = []
+                        # A decoder that exited may still have messages in flight; it is only
+                        # failed if no "end" arrived after one more empty poll of the queue
+                        for video_id, proc in list(active.items()):
+                            if proc.exitcode is None:
+                                continue
+                            if video_id not in exited:
+                                exited.add(video_id)
+                            elif proc.exitcode:
+                                finish(video_id, 0, f"decoder process exited with code {proc.exitcode}")
+                            else:
+                                finish(video_id, 0, "decoder process exited without finishing the video")
+                        continue
+
+                    kind, video_id = message[0], message[1]
+                    if video_id not in active:
+                        continue  # late message of a video that already finished
+                    if kind == "start":
+                        video_file = progress[video_id].video_path
+                        video_name = os.path.splitext(os.path.basename(video_file))[0]
+                        outputs[video_id] = self.make_outputs(video_file, os.path.join(output_base, video_name))
+                        progress[video_id].total_frames = message[2]
+                    elif kind == "frame":
+                        _, _, frame_number, frame = message
+                        progress[video_id].frames_read = frame_number
+                        batch.append((outputs[video_id], progress[video_id], frame_number, frame))
+                        if len(batch) >= self.batch_size:
+                            self._run_batch(batch, writer, target_classes)
+                            batch = []
+                    else:
+                        # The video's last frames may still be waiting in the batch
+                        if batch:
+                            self._run_batch(batch, writer, target_classes)
+                            batch = []
+                        finish(video_id, *message[2:])
+
+                    if time.perf_counter() - last_report >= progress_interval:
+                        last_report = time.perf_counter()
+                        for video_id in active:
+                            logger.info(progress[video_id].line())
+        finally:
+            # Finish the previews of videos cut short by an error
+            for video_outputs in outputs.values():
+                video_outputs.close()
+        return results
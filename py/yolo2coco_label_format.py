@@ -0,0 +1,249 @@
+import json
+import os
+import struct
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm # İlerleme çubuğu için (isteğe bağlı, pip install tqdm)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+
+def _jpeg_size(f):
+  f.seek(2)
+  while True:
+    marker = f.read(2)
+    while marker and marker[0] != 0xFF:
+      marker = marker[1:] + f.read(1)
+    if len(marker) < 2:
+      return None
+    code = marker[1]
+    if code == 0xFF:           # Dolgu baytı
+      f.seek(-1, os.SEEK_CUR)
+      continue
+    if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:  # Uzunluğu olmayan işaretler
+      continue
+    length_bytes = f.read(2)
+    if len(length_bytes) < 2:
+      return None
+    length = struct.unpack(">H", length_bytes)[0]
+    # SOF0..SOF15 (DHT=C4, JPG=C8, DAC=CC hariç) görüntü boyutunu taşır
+    if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+      data = f.read(5)
+      if len(data) < 5:
+        return None
+      height, width = struct.unpack(">HH", data[1:5])
+      return width, height
+    f.seek(length - 2, os.SEEK_CUR)
+
+def read_image_size(path):
+  """
+  Görüntünün (genişlik, yükseklik) bilgisini piksel çözmeden, yalnızca dosya
+  başlığından okur (JPEG, PNG, BMP, GIF, WEBP). Diğer formatlar için
+  yüklüyse PIL'in tembel (lazy) açılışı kullanılır.
+
+  Returns:
+      (width, height) veya okunamazsa None.
+  """
+  try:
+    with open(path, "rb") as f:
+      head = f.read(32)
+      if head[:3] == b"\xff\xd8\xff":
+        return _jpeg_size(f)
+      if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+      if head[:2] == b"BM":
+        width, height = struct.unpack("<ii", head[18:26])
+        return width, abs(height)
+      if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+      if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        chunk = head[12:16]
+        if chunk == b"VP8 ":
+          width, height = struct.unpack("<HH", head[26:30])
+          return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+          bits = int.from_bytes(head[21:25], "little")
+          return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+          return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+  except (OSError, struct.error):
+    return None
+
+  try:
+    from PIL import Image
+    with Image.open(path) as im:
+      return im.size
+  except Exception:
+    return None
+
+def read_yolo_label(label_path):
+  """YOLO .txt dosyasını [[sınıf, cx, cy, w, h], ...] listesine çevirir."""
+  boxes = []
+  with open(label_path, "r") as f:
+    for line in f:
+      parts = line.split()
+      if len(parts) < 5:
+        continue
+      try:
+        boxes.append([int(float(parts[0]))] + [float(x) for x in parts[1:5]])
+      except ValueError:
+        continue
+  return boxes
+
+def find_image_label_pairs(root_dir):
+  """
+  root_dir altındaki tüm 'images' klasörlerini bulur ve her görüntüyü
+  kardeş 'labels' klasöründeki aynı isimli .txt ile eşler.
+
+  Returns:
+      [(görüntünün root_dir'e göre yolu, görüntü yolu, label yolu), ...]
+  """
+  pairs = []
+  for dirpath, dirnames, filenames in os.walk(root_dir):
+    dirnames.sort()
+    if os.path.basename(dirpath).lower() != "images":
+      continue
+    labels_dir = os.path.join(os.path.dirname(dirpath), "labels")
+    for f in sorted(filenames):
+      if f.lower().endswith(IMAGE_EXTS):
+        img_path = os.path.join(dirpath, f)
+        rel = os.path.relpath(img_path, root_dir).replace(os.sep, "/")
+        pairs.append((rel, img_path, os.path.join(labels_dir, os.path.splitext(f)[0] + ".txt")))
+  return pairs
+
+def _scan_entry(args):
+  """Tek bir görüntü-etiket çifti için önbellek kaydını (yeniden) üretir."""
+  img_path, label_path, img_stat, label_mtime, cached = args
+  entry = dict(cached) if cached else {}
+  if not cached or cached["size"] != img_stat.st_size or cached["mtime"] != img_stat.st_mtime_ns:
+    size = read_image_size(img_path)
+    if size is None:
+      return None
+    entry.update(size=img_stat.st_size, mtime=img_stat.st_mtime_ns, width=size[0], height=size[1])
+  if not cached or cached.get("label_mtime") != label_mtime:
+    entry["label_mtime"] = label_mtime
+    entry["boxes"] = read_yolo_label(label_path) if label_mtime is not None else []
+  return entry
+
+def load_class_names(names_path):
+  """classes.txt (satır başına bir isim) dosyasından sınıf isimlerini okur."""
+  with open(names_path, "r", encoding="utf-8") as f:
+    return [line.strip() for line in f if line.strip()]
+
+def yolo_to_coco(root_dir, output_json, class_names=None, workers=8, cache_path=None):
+  """
+  YOLO .txt etiket ağacını (class/images + class/labels) COCO JSON'a dönüştürür.
+
+  Görüntü boyutları piksel çözülmeden başlıklardan okunur ve boyut/mtime ile
+  birlikte bir önbellek (sidecar) dosyasına yazılır. Sonraki çalıştırmalarda
+  yalnızca yeni veya değişmiş görüntü/etiket dosyaları yeniden okunur.
+
+  COCO kategori ID'leri YOLO index + 1'dir (0 = arka plan, Faster R-CNN ile uyumlu);
+  coco2yolo_label_format.py bu ID'leri tekrar 0'dan başlayan indexlere çevirir.
+
+  Args:
+      root_dir: Veri setinin kök klasörü (file_name bu köke göre yazılır).
+      output_json: Oluşturulacak COCO JSON dosyasının yolu.
+      class_names: Sınıf isimleri listesi (None ise class_<id> kullanılır).
+      workers: Başlıkları paralel okuyacak iş parçacığı sayısı.
+      cache_path: Önbellek dosyası (varsayılan: <output_json>.cache.json).
+  """
+  if not os.path.isdir(root_dir):
+    print(f"Hata: Klasör bulunamadı: {root_dir}")
+    return
+
+  cache_path = cache_path or output_json + ".cache.json"
+  cache = {}
+  if os.path.exists(cache_path):
+    try:
+      with open(cache_path, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    except (json.JSONDecodeError, OSError):
+      print(f"Uyarı: Önbellek okunamadı, baştan oluşturulacak: {cache_path}")
+      cache = {}
+
+  pairs = find_image_label_pairs(root_dir)
+  print(f"Toplam {len(pairs)} görüntü bulundu.")
+
+  jobs, new_cache = [], {}
+  for rel, img_path, label_path in pairs:
+    img_stat = os.stat(img_path)
+    try:
+      label_mtime = os.stat(label_path).st_mtime_ns
+    except FileNotFoundError:
+      label_mtime = None
+    cached = cache.get(rel)
+    if (cached and cached["size"] == img_stat.st_size and cached["mtime"] == img_stat.st_mtime_ns
+        and cached.get("label_mtime") == label_mtime):
+      new_cache[rel] = cached
+    else:
+      jobs.append((rel, (img_path, label_path, img_stat, label_mtime, cached)))
+
+  print(f"Önbellekten: {len(new_cache)}  |  Yeni/değişmiş: {len(jobs)}")
+  unreadable = 0
+  if jobs:
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+      results = executor.map(_scan_entry, [job for _, job in jobs], chunksize=64)
+      for (rel, _), entry in zip(jobs, tqdm(results, total=len(jobs), desc="Başlıklar okunuyor")):
+        if entry is None:
+          print(f"Uyarı: Görüntü boyutu okunamadı, atlanıyor: {rel}")
+          unreadable += 1
+          continue
+        new_cache[rel] = entry
+
+  # ----- COCO yapısını oluştur -----
+  images, annotations = [], []
+  max_class = -1
+  ann_id = 1
+  for image_id, (rel, _, _) in enumerate(pairs, start=1):
+    entry = new_cache.get(rel)
+    if entry is None:
+      continue
+    img_w, img_h = entry["width"], entry["height"]
+    images.append({"id": image_id, "file_name": rel, "width": img_w, "height": img_h})
+    for cls, cx, cy, w, h in entry["boxes"]:
+      bw, bh = w * img_w, h * img_h
+      annotations.append({
+          "id": ann_id,
+          "image_id": image_id,
+          "category_id": cls + 1,
+          "bbox": [(cx - w / 2) * img_w, (cy - h / 2) * img_h, bw, bh],
+          "area": bw * bh,
+          "iscrowd": 0,
+      })
+      ann_id += 1
+      max_class = max(max_class, cls)
+
+  n_classes = max(len(class_names or []), max_class + 1)
+  categories = [{"id": i + 1, "name": class_names[i] if class_names and i < len(class_names) else f"class_{i}"}
+                for i in range(n_classes)]
+
+  out_dir = os.path.dirname(os.path.abspath(output_json))
+  os.makedirs(out_dir, exist_ok=True)
+  with open(output_json, "w", encoding="utf-8") as f:
+    json.dump({"images": images, "annotations": annotations, "categories": categories}, f, ensure_ascii=False)
+
+  # Önbelleği atomik yaz (yarıda kalan çalıştırma bozuk dosya bırakmasın)
+  tmp_path = cache_path + ".tmp"
+  with open(tmp_path, "w", encoding="utf-8") as f:
+    json.dump(new_cache, f)
+  os.replace(tmp_path, cache_path)
+
+  print("\nDönüştürme tamamlandı.")
+  print(f"{len(images)} görüntü, {len(annotations)} annotasyon, {len(categories)} kategori: {output_json}")
+  if unreadable:
+    print(f"Uyarı: {unreadable} görüntünün boyutu okunamadı.")
+
+# Komut satırı argümanlarını işlemek için
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert a YOLO label tree (images/ + labels/) to a COCO JSON file.')
+    parser.add_argument('root_dir', type=str, help='Dataset root; every */images folder is paired with its sibling labels folder.')
+    parser.add_argument('output_json', type=str, help='Path of the COCO JSON file to write.')
+    parser.add_argument('--names', type=str, default=None, help='Optional classes.txt with one class name per line.')
+    parser.add_argument('--workers', type=int, default=8, help='Threads used to read image headers.')
+    parser.add_argument('--cache', type=str, default=None,
+                        help='Sidecar cache of image sizes/labels (default: <output_json>.cache.json).')
+
+    args = parser.parse_args()
+
+    names = load_class_names(args.names) if args.names else None
+    yolo_to_coco(args.root_dir, args.output_json, class_names=names, workers=args.workers, cache_path=args.cache)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Araçlar paket değil, py/ altındaki betiklerdir
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
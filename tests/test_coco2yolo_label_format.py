@@ -0,0 +1,44 @@
+import json
+import warnings
+import pytest
+from coco2yolo_label_format import coco_to_yolo, coco_to_yolo_streaming, convert_coco_bboxes_to_yolo_batch
+
+COCO = {
+    "images": [
+        {"id": 1, "file_name": "a.jpg", "width": 100, "height": 100},
+        {"id": 2, "file_name": "b.jpg", "width": 200, "height": 100},
+        {"id": 1, "file_name": "a.jpg", "width": 100, "height": 100},  # tekrarlanan kayıt
+    ],
+    "categories": [{"id": 7, "name": "tup"}],
+    "annotations": [
+        {"id": 1, "image_id": 1, "category_id": 7, "bbox": [1, 1, 10, 20]},
+        {"id": 2, "image_id": 2, "category_id": 7, "bbox": [50, 10, 20, 20]},
+    ],
+}
+
+
+def _read_labels(folder):
+    return {p.name: p.read_text() for p in sorted(folder.iterdir())}
+
+
+@pytest.mark.parametrize("convert", [coco_to_yolo, coco_to_yolo_streaming])
+def test_repeated_image_entries_keep_labels(tmp_path, convert):
+    json_path = tmp_path / "coco.json"
+    json_path.write_text(json.dumps(COCO))
+
+    convert(str(json_path), str(tmp_path / "labels"))
+
+    assert _read_labels(tmp_path / "labels") == {
+        "a.txt": "0 0.060000 0.110000 0.100000 0.200000\n",
+        "b.txt": "0 0.300000 0.200000 0.100000 0.200000\n",
+    }
+
+
+def test_batch_zero_sized_image_drops_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        _, keep, stats = convert_coco_bboxes_to_yolo_batch(
+            [[1, 1, 10, 20], [0, 0, 5, 5], [2, 2, 4, 4]], [0, 100, 100], [100, 0, 100])
+
+    assert keep.tolist() == [False, False, True]
+    assert stats == {"clipped": 0, "dropped": 2}
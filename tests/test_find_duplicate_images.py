@@ -0,0 +1,57 @@
+from find_duplicate_images import group_near_duplicates, build_deletion_plan
+
+
+def _record(name, size=100, label=True):
+    return {"path": name, "label": name + ".txt" if label else None, "size": size}
+
+
+def test_chain_is_not_merged_transitively():
+    # Her adımda 2 bit değişen zincir: komşular radius=4 içinde, uçlar 24 bit uzak
+    hashes = [(1 << (2 * i)) - 1 for i in range(13)]
+    records = [_record(f"f{i:02d}.jpg") for i in range(13)]
+
+    groups = group_near_duplicates(records, hashes, radius=4)
+    plan = build_deletion_plan(groups, "dhash")
+
+    kept = {g["keep"] for g in plan}
+    for g in plan:
+        keep_hash = hashes[int(g["keep"][1:3])]
+        for item in g["delete"]:
+            assert bin(keep_hash ^ hashes[int(item["image"][1:3])]).count("1") <= 4
+    deleted = {item["image"] for g in plan for item in g["delete"]}
+    assert not kept & deleted
+    # Uçlar aynı gruba düşmez: zincir tek bir görsele indirgenmez
+    assert len(kept) > 1
+    assert not any({"f00.jpg", "f12.jpg"} <= {g["keep"]} | {item["image"] for item in g["delete"]} for g in plan)
+
+
+def test_group_keeps_best_record():
+    hashes = [0b1111, 0b1110, None, 0]
+    records = [_record("a.jpg", size=10), _record("b.jpg", size=50), _record("c.jpg"),
+               _record("d.jpg", size=90, label=False)]
+
+    groups = group_near_duplicates(records, hashes, radius=3)
+    plan = build_deletion_plan(groups, "dhash")
+
+    assert [g["keep"] for g in plan] == ["b.jpg"]
+    assert sorted(item["image"] for item in plan[0]["delete"]) == ["a.jpg", "d.jpg"]
+
+
+def test_apply_keeps_label_shared_with_keeper(tmp_path):
+    from find_duplicate_images import find_duplicate_images, apply_plan
+    images = tmp_path / "cls" / "images"
+    labels = tmp_path / "cls" / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir()
+    (images / "a.jpeg").write_bytes(b"same bytes")
+    (images / "a.png").write_bytes(b"same bytes")
+    (images / "b.jpg").write_bytes(b"other bytes")
+    (images / "c.jpg").write_bytes(b"other bytes")
+    for name in ("a", "b", "c"):
+        (labels / f"{name}.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+
+    plan = find_duplicate_images(str(tmp_path), near=False, workers=1)
+    apply_plan(plan)
+
+    assert sorted(p.name for p in images.iterdir()) == ["a.jpeg", "b.jpg"]
+    assert sorted(p.name for p in labels.iterdir()) == ["a.txt", "b.txt"]
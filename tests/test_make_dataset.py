@@ -0,0 +1,83 @@
+import os
+import re
+import time
+import cv2
+import numpy as np
+import make_dataset_with_equalized_labels_and_augmentations as md
+
+# Küçük (32 px görselde ~0.3 px) kutu: augment kopyalarına olduğu gibi geçmeli
+LABEL = "0 0.5 0.5 0.01 0.01\n1 0.123456789 0.5 0.4 0.4"
+
+
+def _busy_augment(src_img, n_copies):
+    # Hangi işçinin çalıştığını kaydeder; kısa bekleme görevlerin çakışmasını sağlar
+    with open(os.path.join(os.environ["AUG_PID_DIR"], f"{os.getpid()}_{time.monotonic_ns()}"), "w"):
+        pass
+    time.sleep(0.2)
+    return md._real_augment_source(src_img, n_copies)
+
+
+def _make_class(root, n_images):
+    os.makedirs(os.path.join(root, "cls", "images"))
+    os.makedirs(os.path.join(root, "cls", "labels"))
+    for i in range(n_images):
+        cv2.imwrite(os.path.join(root, "cls", "images", f"{i}.jpg"), np.full((32, 32, 3), i * 20, np.uint8))
+        with open(os.path.join(root, "cls", "labels", f"{i}.txt"), "w") as f:
+            f.write(LABEL)
+
+
+def test_plan_class_chunks_copies_per_source(tmp_path, monkeypatch):
+    _make_class(tmp_path / "src", 2)
+    monkeypatch.setattr(md, "source_dir", str(tmp_path / "src"))
+    monkeypatch.setattr(md, "output_dir", str(tmp_path / "out"))
+    monkeypatch.setattr(md, "val_split", 0)
+    monkeypatch.setattr(md, "train_split", 42)
+    monkeypatch.setattr(md, "aug_chunk_size", 16)
+    md.make_dirs(str(tmp_path / "out"), ["cls"])
+
+    jobs = md.plan_class("cls", md.list_images(str(tmp_path / "src" / "cls" / "images")))
+    aug = [job for job in jobs if job["kind"] == "aug"]
+    assert [len(job["copies"]) for job in aug] == [16, 4, 16, 4]
+    names = sorted(os.path.basename(img) for job in aug for img, _ in job["copies"])
+    assert len(names) == 40 and len(set(names)) == 40
+    for job in aug:
+        stem = os.path.splitext(os.path.basename(job["src_img"]))[0]
+        assert all(os.path.basename(img).startswith(stem + "_aug") for img, _ in job["copies"])
+
+
+def test_augment_groups_use_several_workers(tmp_path, monkeypatch, capsys):
+    pid_dir = tmp_path / "pids"
+    pid_dir.mkdir()
+    _make_class(tmp_path / "src", 4)
+    monkeypatch.setenv("AUG_PID_DIR", str(pid_dir))
+    monkeypatch.setattr(md, "source_dir", str(tmp_path / "src"))
+    monkeypatch.setattr(md, "output_dir", str(tmp_path / "out"))
+    monkeypatch.setattr(md, "val_split", 0)
+    monkeypatch.setattr(md, "train_split", 20)
+    monkeypatch.setattr(md, "aug_chunk_size", 2)
+    monkeypatch.setattr(md, "num_workers", 2)
+    monkeypatch.setattr(md, "_real_augment_source", md.augment_source, raising=False)
+    monkeypatch.setattr(md, "augment_source", _busy_augment)
+    md.make_dirs(str(tmp_path / "out"), ["cls"])
+
+    results = md.run_pipeline({"cls": md.list_images(str(tmp_path / "src" / "cls" / "images"))}, mode="copy")
+
+    assert results["cls"] == {"copy": 4, "aug": 16}
+    hits, misses, evictions = map(int, re.search(r"(\d+) isabet, (\d+) kaçırma, (\d+) tahliye",
+                                                 capsys.readouterr().out).groups())
+    assert hits + misses == 8 and 4 <= misses <= 8 and evictions == 0
+    labels_dir = tmp_path / "out" / "train" / "cls" / "labels"
+    assert len(os.listdir(labels_dir)) == 20
+    assert all((labels_dir / name).read_text() == LABEL for name in os.listdir(labels_dir))
+    pids = {name.split("_")[0] for name in os.listdir(pid_dir)}
+    assert len(pids) > 1  # 8 görev tek işçiye yığılmamalı
+
+
+def test_decode_cache_evicts_by_bytes():
+    cache = md.DecodeCache(max_bytes=250)
+    load = lambda: np.zeros(100, np.uint8)
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get(key, load)
+    # a, b sığar; c gelince en eski kullanılan b çıkar, sonra b yeniden okunur ve a çıkar
+    assert cache.stats() == (1, 4, 2)
+    assert list(cache.entries) == ["c", "b"]
@@ -0,0 +1,53 @@
+import os
+import yaml
+from make_split_manifests import write_split_manifests
+
+
+def _make_dataset(root):
+    for cls in ("a", "b"):
+        os.makedirs(root / cls / "images")
+        os.makedirs(root / cls / "labels")
+        for i in range(5):
+            (root / cls / "images" / f"{i}.jpg").write_bytes(b"\xff\xd8\xff")
+            if i < 3:
+                (root / cls / "labels" / f"{i}.txt").write_text(f"{'ab'.index(cls)} 0.5 0.5 0.2 0.2\n")
+
+
+def _manifest_images(out_dir):
+    images = []
+    for split in ("train", "val"):
+        with open(out_dir / f"{split}.txt") as f:
+            images += f.read().split()
+    return images
+
+
+def test_background_images_are_split(tmp_path):
+    _make_dataset(tmp_path / "data")
+
+    counts = write_split_manifests(str(tmp_path / "data"), str(tmp_path / "splits"), val_ratio=0.5)
+
+    assert sum(counts.values()) == 10
+    images = _manifest_images(tmp_path / "splits")
+    assert os.path.join(str(tmp_path / "data"), "a", "images", "4.jpg") in images
+
+
+def test_skip_background(tmp_path):
+    _make_dataset(tmp_path / "data")
+
+    counts = write_split_manifests(str(tmp_path / "data"), str(tmp_path / "splits"), val_ratio=0.5,
+                                   skip_background=True)
+
+    assert sum(counts.values()) == 6
+    assert not any(os.path.basename(p) in ("3.jpg", "4.jpg") for p in _manifest_images(tmp_path / "splits"))
+
+
+def test_data_yaml_quotes_special_names(tmp_path):
+    _make_dataset(tmp_path / "data")
+    names = ["tüp: kapaklı", "#2 sarı"]
+
+    write_split_manifests(str(tmp_path / "data"), str(tmp_path / "splits"), class_names=names)
+
+    with open(tmp_path / "splits" / "data.yaml", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    assert data["names"] == {0: "tüp: kapaklı", 1: "#2 sarı"}
+    assert data["train"] == "train.txt"
@@ -0,0 +1,23 @@
+import materialize
+
+
+def test_reflink_failure_is_remembered_per_device(tmp_path, monkeypatch):
+    calls = []
+
+    def no_reflink(src, dst):
+        calls.append(dst)
+        raise OSError("reflink desteklenmiyor")
+
+    monkeypatch.setattr(materialize, "_reflink", no_reflink)
+    monkeypatch.setattr(materialize, "_no_reflink_devices", set())
+    (tmp_path / "src").mkdir()
+    (tmp_path / "dst").mkdir()
+    methods = []
+    for i in range(3):
+        src = tmp_path / "src" / f"{i}.jpg"
+        src.write_bytes(b"\xff\xd8\xff" + bytes([i]))
+        methods.append(materialize.materialize(str(src), str(tmp_path / "dst" / f"{i}.jpg"), "auto"))
+
+    assert len(calls) == 1
+    assert methods == ["hardlink"] * 3
+    assert (tmp_path / "dst" / "2.jpg").read_bytes() == b"\xff\xd8\xff\x02"
@@ -0,0 +1,58 @@
+import os
+
+import merge_class_folders_to_create_datas as mcf
+
+JPEG_BYTES = b"\xff\xd8\xff\xe0" + b"\x00" * 32
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_same_content_siblings_keep_separate_outputs(tmp_path, monkeypatch):
+    src, dst = tmp_path / "split", tmp_path / "merged"
+    monkeypatch.setattr(mcf, "base_dir", str(src))
+    monkeypatch.setattr(mcf, "merged_dir", str(dst))
+    mcf.make_dirs(str(dst))
+    images = src / "train" / "cls" / "images"
+    # Aynı içerik, aynı dosya adı, farklı uzantı; label a.txt ikisince paylaşılır
+    _write(str(images / "a.jpg"), JPEG_BYTES)
+    _write(str(images / "a.png"), JPEG_BYTES)
+    _write(str(src / "train" / "cls" / "labels" / "a.txt"), b"0 0.5 0.5 0.1 0.1\n")
+    out_images = dst / "train" / "images"
+
+    manifest = {}
+    mcf.merge_split("train", None, manifest, mode="copy")
+    names = {entry["name"] for entry in manifest["train"].values()}
+    assert len(names) == 2
+    assert sorted(os.listdir(out_images)) == sorted(name + ".jpg" for name in names)
+
+    os.remove(images / "a.png")
+    mcf.merge_split("train", None, manifest, mode="copy")
+    kept = manifest["train"]["cls/images/a.jpg"]["name"]
+    assert os.listdir(out_images) == [kept + ".jpg"]
+    assert os.path.exists(dst / "train" / "labels" / (kept + ".txt"))
+
+
+def test_legacy_colliding_names_are_split(tmp_path, monkeypatch):
+    src, dst = tmp_path / "split", tmp_path / "merged"
+    monkeypatch.setattr(mcf, "base_dir", str(src))
+    monkeypatch.setattr(mcf, "merged_dir", str(dst))
+    mcf.make_dirs(str(dst))
+    images = src / "train" / "cls" / "images"
+    _write(str(images / "a.jpg"), JPEG_BYTES)
+    _write(str(images / "a.png"), JPEG_BYTES)
+    out_images = dst / "train" / "images"
+
+    # Eski isim düzeninde iki kaynak tek çıktıya yazılmış
+    legacy = "cls_a_" + mcf.file_hash(str(images / "a.jpg"))
+    _write(str(out_images / (legacy + ".jpg")), JPEG_BYTES)
+    manifest = {"train": {rel: {"image": mcf._stat_key(str(src / "train" / rel)), "label": None, "name": legacy}
+                          for rel in ("cls/images/a.jpg", "cls/images/a.png")}}
+
+    mcf.merge_split("train", None, manifest, mode="copy")
+    names = {entry["name"] for entry in manifest["train"].values()}
+    assert len(names) == 2
+    assert sorted(os.listdir(out_images)) == sorted(name + ".jpg" for name in names)
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+from sliced_inference import SlicedPredictor
+
+
+class _Boxes:
+    def __init__(self, n):
+        self.xyxy = np.tile([[1.0, 1.0, 11.0, 11.0]], (n, 1))
+        self.conf = np.full(n, 0.9)
+        self.cls = np.zeros(n)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+
+class _Result:
+    def __init__(self, n):
+        self.boxes = _Boxes(n)
+
+
+class ShortModel:
+    """Her çağrıda son dilimin sonucunu döndürmeyen sahte model."""
+
+    def predict(self, source, **kwargs):
+        return [_Result(1) for _ in source[:-1]]
+
+
+def test_short_results_do_not_stall_later_images(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.jpg"
+        cv2.imwrite(str(path), np.zeros((100, 150, 3), np.uint8))
+        paths.append(path)
+
+    predictor = SlicedPredictor(ShortModel(), slice_size=64, overlap=0.2, batch_size=5)
+    out = list(predictor.predict_paths(paths, decode_threads=1))
+
+    assert [path for path, *_ in out] == paths
+    assert all(shape == (100, 150) and len(xyxy) for _, shape, xyxy, _, _ in out)
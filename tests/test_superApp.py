@@ -0,0 +1,33 @@
+import os
+import cv2
+import numpy as np
+import superApp
+
+
+def _make_class(folder, value):
+    os.makedirs(folder / "images")
+    os.makedirs(folder / "labels")
+    cv2.imwrite(str(folder / "images" / "0.jpg"), np.full((64, 64, 3), value, np.uint8))
+    (folder / "labels" / "0.txt").write_text("0 0.5 0.5 0.4 0.4\n")
+
+
+def test_same_file_name_in_different_classes_gets_different_seed(tmp_path):
+    a = superApp._job_seed(0, str(tmp_path / "a" / "images" / "0.jpg"), str(tmp_path))
+    b = superApp._job_seed(0, str(tmp_path / "b" / "images" / "0.jpg"), str(tmp_path))
+    moved = superApp._job_seed(0, str(tmp_path / "x" / "a" / "images" / "0.jpg"), str(tmp_path / "x"))
+    assert a != b
+    assert a == moved
+
+
+def test_serial_augment_keeps_opencv_threads(tmp_path, monkeypatch):
+    _make_class(tmp_path / "a", 100)
+    monkeypatch.setattr(superApp, "_worker_transform", None)
+    threads = cv2.getNumThreads()
+    cv2.setNumThreads(3)
+    try:
+        superApp.augment_images({str(tmp_path / "a"): {}}, augment_count=1, workers=1, seed=0,
+                                root_dir=str(tmp_path))
+        assert cv2.getNumThreads() == 3
+    finally:
+        cv2.setNumThreads(threads)
+    assert (tmp_path / "a" / "images" / "0_aug.jpg").exists()